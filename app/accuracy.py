@@ -0,0 +1,307 @@
+import os
+import csv
+import json
+import math
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# === Configuration ===
+RESULTS_DIR = "results"
+ACCURACY_DIR = "accuracy"
+RESULTS_CSV = os.path.join(ACCURACY_DIR, "accuracy_analysis_results.csv")
+SUMMARY_JSON = os.path.join(ACCURACY_DIR, "accuracy_analysis_summary.json")
+STATE_JSON = os.path.join(ACCURACY_DIR, "accuracy_state.json")
+
+# Saved prediction file -> model_type used in the accuracy results
+MODEL_FILES = {"lstm": "lstm.csv", "lstm_senti": "lstm_senti.csv"}
+COLUMNS = [
+    "prediction_date", "target_date", "symbol", "model_type", "predicted_price", "actual_price",
+    "absolute_error", "percentage_error", "relative_error", "accuracy",
+]
+
+
+def calculate_metrics(predicted, actual):
+    """Per-prediction error metrics (same definitions as the original notebook)."""
+    if actual == 0:
+        return {"absolute_error": abs(predicted), "percentage_error": float("inf"),
+                "relative_error": float("inf"), "accuracy": 0.0}
+    absolute_error = abs(predicted - actual)
+    percentage_error = (absolute_error / abs(actual)) * 100
+    return {
+        "absolute_error": absolute_error,
+        "percentage_error": percentage_error,
+        "relative_error": ((predicted - actual) / actual) * 100,
+        "accuracy": max(0.0, 100 - percentage_error),
+    }
+
+
+def new_aggregate():
+    return {"count": 0, "mean_accuracy": 0.0, "m2_accuracy": 0.0, "sum_percentage_error": 0.0,
+            "sum_absolute_error": 0.0, "best_accuracy": None, "worst_accuracy": None,
+            "first_target_date": None, "last_target_date": None}
+
+
+def add_to_aggregate(agg, row):
+    """Fold one scored row into a running aggregate (Welford mean/variance)."""
+    agg["count"] += 1
+    delta = row["accuracy"] - agg["mean_accuracy"]
+    agg["mean_accuracy"] += delta / agg["count"]
+    agg["m2_accuracy"] += delta * (row["accuracy"] - agg["mean_accuracy"])
+    agg["sum_percentage_error"] += row["percentage_error"]
+    agg["sum_absolute_error"] += row["absolute_error"]
+    agg["best_accuracy"] = max(row["accuracy"], agg["best_accuracy"] if agg["best_accuracy"] is not None else -math.inf)
+    agg["worst_accuracy"] = min(row["accuracy"], agg["worst_accuracy"] if agg["worst_accuracy"] is not None else math.inf)
+    agg["first_target_date"] = min(filter(None, (agg["first_target_date"], row["target_date"])))
+    agg["last_target_date"] = max(filter(None, (agg["last_target_date"], row["target_date"])))
+
+
+def describe(agg):
+    """Public view of an aggregate."""
+    count = agg["count"]
+    if not count:
+        return {"total_predictions": 0}
+    std = math.sqrt(agg["m2_accuracy"] / (count - 1)) if count > 1 else 0.0
+    return {
+        "total_predictions": count,
+        "mean_accuracy": round(agg["mean_accuracy"], 2),
+        "std_accuracy": round(std, 2),
+        "mean_percentage_error": round(agg["sum_percentage_error"] / count, 2),
+        "mean_absolute_error": round(agg["sum_absolute_error"] / count, 4),
+        "best_accuracy": round(agg["best_accuracy"], 2),
+        "worst_accuracy": round(agg["worst_accuracy"], 2),
+        "first_target_date": agg["first_target_date"],
+        "last_target_date": agg["last_target_date"],
+    }
+
+
+class AccuracyEngine:
+    """Scores saved predictions against actual closes as the datasets catch up.
+
+    Each run only reads prediction days it has not seen yet and retries the
+    predictions still waiting for their target day's close; newly scored rows
+    are appended to accuracy_analysis_results.csv and folded into running
+    per-symbol/per-model aggregates kept in accuracy_state.json.
+    """
+
+    def __init__(self, results_dir=RESULTS_DIR, results_csv=RESULTS_CSV,
+                 summary_json=SUMMARY_JSON, state_json=STATE_JSON, log=print):
+        self.results_dir = results_dir
+        self.results_csv = results_csv
+        self.summary_json = summary_json
+        self.state_json = state_json
+        self.log = log
+        self._lock = threading.Lock()
+        self._state = None
+        self._state_mtime = None
+
+    # === Updating ===
+    def update(self, today=None):
+        """Score every newly resolvable prediction; returns the number of rows appended."""
+        from app.price_store import price_store
+
+        today = today or datetime.today().strftime("%Y-%m-%d")
+        with self._lock:
+            state = self._load_state()
+            pending = state["pending"] + self._new_predictions(state["last_prediction_date"], today)
+            if pending:
+                state["last_prediction_date"] = max(state["last_prediction_date"] or "",
+                                                    max(p[0] for p in pending))
+
+            scored, still_pending, series_by_symbol = [], [], {}
+            for prediction_date, model_type, symbol, predicted in pending:
+                if symbol not in series_by_symbol:
+                    try:
+                        series_by_symbol[symbol] = price_store.get(symbol)
+                    except FileNotFoundError:
+                        series_by_symbol[symbol] = None
+                series = series_by_symbol[symbol]
+
+                # Predictions are for the next calendar day; use the first close on or after it
+                target_date = (datetime.strptime(prediction_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+                idx = np.searchsorted(series.dates, np.datetime64(target_date, "D")) if series is not None else 0
+                if series is None or idx >= len(series):
+                    still_pending.append([prediction_date, model_type, symbol, predicted])
+                    continue
+
+                actual = float(series.close[idx])
+                scored.append({
+                    "prediction_date": prediction_date,
+                    "target_date": target_date,
+                    "symbol": symbol,
+                    "model_type": model_type,
+                    "predicted_price": predicted,
+                    "actual_price": actual,
+                    **calculate_metrics(predicted, actual),
+                })
+
+            for row in scored:
+                for agg in self._aggregates_for(state, row):
+                    add_to_aggregate(agg, row)
+            state["pending"] = still_pending
+
+            self._append_rows(scored)
+            self._save_state(state)
+            self._write_summary(state)
+
+        self.log(f"🎯 Accuracy: scored {len(scored)} predictions, {len(still_pending)} awaiting actual prices")
+        return len(scored)
+
+    def _new_predictions(self, after, today):
+        """Predictions from results/{date}/ for dates after `after` and before `today`."""
+        if not os.path.isdir(self.results_dir):
+            return []
+        new = []
+        for day in sorted(os.listdir(self.results_dir)):
+            # Today's folder may still be being written; it is picked up on the next run
+            if (after and day <= after) or day >= today:
+                continue
+            try:
+                datetime.strptime(day, "%Y-%m-%d")
+            except ValueError:
+                continue
+            for model_type, filename in MODEL_FILES.items():
+                path = os.path.join(self.results_dir, day, filename)
+                if not os.path.exists(path):
+                    continue
+                with open(path, newline="") as f:
+                    for row in csv.DictReader(f):
+                        if row.get("predicted_price"):
+                            new.append([day, model_type, row["symbol"], float(row["predicted_price"])])
+        return new
+
+    @staticmethod
+    def _aggregates_for(state, row):
+        aggs = state["aggregates"]
+        symbol = aggs["symbol"].setdefault(row["symbol"], new_aggregate())
+        by_model = aggs["symbol_model"].setdefault(row["symbol"], {})
+        return (
+            aggs["overall"],
+            aggs["model"].setdefault(row["model_type"], new_aggregate()),
+            symbol,
+            by_model.setdefault(row["model_type"], new_aggregate()),
+        )
+
+    def _append_rows(self, rows):
+        if not rows:
+            return
+        os.makedirs(os.path.dirname(self.results_csv) or ".", exist_ok=True)
+        write_header = not os.path.exists(self.results_csv) or os.path.getsize(self.results_csv) == 0
+        with open(self.results_csv, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            if write_header:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    # === State ===
+    def _load_state(self):
+        if self._state is not None and self._state_mtime == self._mtime():
+            return self._state
+        try:
+            with open(self.state_json) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = self._bootstrap()
+        self._state, self._state_mtime = state, self._mtime()
+        return state
+
+    def _bootstrap(self):
+        """Build the aggregates once from an existing results CSV (e.g. the notebook's)."""
+        state = {
+            "last_prediction_date": None,
+            "pending": [],
+            "aggregates": {"overall": new_aggregate(), "model": {}, "symbol": {}, "symbol_model": {}},
+        }
+        if os.path.exists(self.results_csv):
+            with open(self.results_csv, newline="") as f:
+                for raw in csv.DictReader(f):
+                    row = {**raw, **{k: float(raw[k]) for k in ("absolute_error", "percentage_error", "accuracy")}}
+                    for agg in self._aggregates_for(state, row):
+                        add_to_aggregate(agg, row)
+                    state["last_prediction_date"] = max(state["last_prediction_date"] or "", row["prediction_date"])
+        return state
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_json) or ".", exist_ok=True)
+        tmp_path = f"{self.state_json}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_json)
+        self._state, self._state_mtime = state, self._mtime()
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.state_json)
+        except OSError:
+            return None
+
+    def _write_summary(self, state):
+        aggs = state["aggregates"]
+        overall = describe(aggs["overall"])
+        if not overall["total_predictions"]:
+            return
+        stocks = {s: describe(a) for s, a in sorted(aggs["symbol"].items())}
+        models = {m: describe(a) for m, a in sorted(aggs["model"].items())}
+        best = max(stocks, key=lambda s: stocks[s]["mean_accuracy"])
+        worst = min(stocks, key=lambda s: stocks[s]["mean_accuracy"])
+
+        summary = {
+            "report_metadata": {
+                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "analysis_period": f"{overall['first_target_date']} to {overall['last_target_date']}",
+                "total_predictions": overall["total_predictions"],
+                "stocks_analyzed": len(stocks),
+                "models_compared": len(models),
+            },
+            "overall_performance": {
+                "mean_accuracy_percent": overall["mean_accuracy"],
+                "std_accuracy_percent": overall["std_accuracy"],
+                "mean_percentage_error": overall["mean_percentage_error"],
+                "best_accuracy_percent": overall["best_accuracy"],
+                "worst_accuracy_percent": overall["worst_accuracy"],
+            },
+            "model_comparison": models,
+            "stock_performance": stocks,
+            "key_insights": [
+                f"Overall prediction accuracy averaged {overall['mean_accuracy']}% across all stocks and models",
+                f"Most predictable stock: {best} with {stocks[best]['mean_accuracy']}% average accuracy",
+                f"Least predictable stock: {worst} with {stocks[worst]['mean_accuracy']}% average accuracy",
+                f"Analysis covered {overall['total_predictions']} predictions across {len(stocks)} different stocks",
+            ],
+        }
+        tmp_path = f"{self.summary_json}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_path, self.summary_json)
+
+    # === Reading ===
+    def symbol_accuracy(self, symbol):
+        """Running accuracy for one symbol (overall and per model), or None if never scored."""
+        with self._lock:
+            state = self._load_state()
+        aggs = state["aggregates"]
+        if symbol not in aggs["symbol"]:
+            return None
+        return {
+            "stock": symbol,
+            **describe(aggs["symbol"][symbol]),
+            "models": {m: describe(a) for m, a in sorted(aggs["symbol_model"].get(symbol, {}).items())},
+            "pending_predictions": sum(p[2] == symbol for p in state["pending"]),
+        }
+
+
+accuracy_engine = AccuracyEngine()
+
+
+def update_accuracy(today=None, log=print):
+    """Score newly resolvable predictions (run after every dataset refresh)."""
+    return AccuracyEngine(log=log).update(today)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score saved predictions against actual closing prices.")
+    parser.add_argument("--today", help="treat this date (YYYY-MM-DD) as today")
+    args = parser.parse_args()
+    update_accuracy(args.today)
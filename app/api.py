@@ -1,16 +1,82 @@
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse, FileResponse
-import pandas as pd
+import time as pytime
+IMPORT_STARTED = pytime.perf_counter()
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, FileResponse, Response
 import os
 from datetime import datetime
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timedelta, time
+from contextlib import asynccontextmanager
+
+import threading
+import functools
+
+from app.startup import startup
+from app.model_cache import model_cache
+from app.inference_pool import inference_pool, InferenceQueueFull
+from app.snapshot_cache import snapshot_cache
+from app.http_cache import file_response, json_cache_middleware
+from app.metrics import registry, request_seconds, precomputed_lookups
+from app.results_index import results_index, RESULT_FILES, PRECOMPUTED_TIME_STEPS
+from app.symbols import symbol_registry
+
+# Only the worker holding the scheduler lock runs the daily jobs
+def start_daily_scheduler():
+    with startup.phase("scheduler"):
+        from app import scheduler
+        if scheduler.SCHEDULER_MODE == "leader":
+            scheduler.start_scheduler()
+
+@asynccontextmanager
+async def lifespan(app):
+    # Serve immediately; TensorFlow/model warm-up and the scheduler start in the background
+    startup.start()
+    threading.Thread(target=start_daily_scheduler, name="scheduler-start", daemon=True).start()
+    yield
+    from app import scheduler
+    scheduler.stop_scheduler()
+
+app = FastAPI(lifespan=lifespan)
+
+def queue_full_response(e):
+    return JSONResponse(content={"error": str(e)}, status_code=503, headers={"Retry-After": str(e.retry_after)})
+
+# Part of every single-flight key, so a request never joins a computation made on older data
+def data_version(*paths):
+    versions = []
+    for path in paths:
+        try:
+            versions.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            versions.append(None)
+    return (get_today(), *versions)
+
+def dataset_paths(symbols):
+    return [f"datasets/{s}_daily_data.csv" for s in symbols]
+
+# Live failures (model load, missing dataset) are transient: keep them out of shared caches until the rollover
+def live_response(content, errors):
+    if errors:
+        return JSONResponse(content=content, headers={"Cache-Control": "no-cache"})
+    return content
 
-import app.scheduler  # ensures the daily scheduler runs
+# A dict lookup in the symbol registry, so unknown symbols never reach the filesystem or the models
+def symbol_error(symbol, model=None):
+    info = symbol_registry.get(symbol.upper())
+    if info is None:
+        return f"Unknown symbol: {symbol.upper()}"
+    if model is not None and model not in info.models:
+        return f"Model {model} is not enabled for {info.symbol}"
+    return None
 
-app = FastAPI()
+def unknown_symbol(symbol, model=None):
+    error = symbol_error(symbol, model)
+    if error is not None:
+        return JSONResponse(content={"error": error}, status_code=404)
+    return None
 
 # Test
 def get_today():
@@ -30,6 +96,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ETag/304, Cache-Control and gzip/br for JSON responses
+app.middleware("http")(json_cache_middleware)
+
+# Request latency per route template (not per raw path, to keep label counts bounded)
+@app.middleware("http")
+async def record_request_latency(request, call_next):
+    start = pytime.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    request_seconds.observe(
+        pytime.perf_counter() - start,
+        method=request.method,
+        route=route.path if route is not None else "unmatched",
+        status=response.status_code,
+    )
+    return response
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
@@ -40,9 +123,37 @@ def favicon():
         return FileResponse(favicon_path, media_type="image/x-icon")
     return JSONResponse(content={"error": "Favicon not found"}, status_code=404)
 
+# Liveness: the process serves requests. Readiness: the background warm-up has finished.
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "date": get_today()}
+    return {"status": "ok", "date": get_today(), **startup.status()}
+
+@app.get("/health/live")
+def liveness():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def readiness():
+    status = startup.status()
+    if not status["ready"]:
+        return JSONResponse(content={"status": "warming_up", **status}, status_code=503)
+    return {"status": "ready", **status}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/models")
+def model_cache_stats():
+    return model_cache.stats()
+
+@app.get("/cache/snapshots")
+def snapshot_cache_stats():
+    return snapshot_cache.stats()
+
+@app.get("/cache/inference")
+def inference_pool_stats():
+    return inference_pool.stats()
 
 @app.get("/")
 def root():
@@ -51,22 +162,38 @@ def root():
         "created_by": "Sevinda-Herath",
     }
 
+@app.get("/symbols")
+def list_symbols():
+    return {"symbols": [symbol_registry.get(s).as_dict() for s in symbol_registry.symbols()]}
+
 
 # Sentiments Section
 
 @app.get("/sentiment_summary/{symbol}")
 def get_summary(symbol: str):
-    file_path = f"sentiments/summary/{get_today()}/{symbol.upper()}_summary.csv"
-    if not os.path.exists(file_path):
+    error = unknown_symbol(symbol)
+    if error is not None:
+        return error
+    today = get_today()
+    summary_dir = f"sentiments/summary/{today}"
+    # One combined file holds every symbol; the per-symbol file covers partial runs
+    body = (snapshot_cache.row(f"{summary_dir}/all_symbols_summary.csv", symbol.upper(), day=today)
+            or snapshot_cache.row(f"{summary_dir}/{symbol.upper()}_summary.csv", day=today))
+    if body is None:
         return JSONResponse(content={"error": "Summary not found"}, status_code=404)
-    df = pd.read_csv(file_path)
-    return df.to_dict(orient="records")[0]
+    return Response(content=body, media_type="application/json")
 
 @app.get("/sentiment_chart/{symbol}")
-def get_chart(symbol: str):
-    chart_path = f"sentiments/charts/{get_today()}/{symbol.upper()}_chart.png"
-    if os.path.exists(chart_path):
-        return FileResponse(chart_path, media_type="image/png")
+def get_chart(symbol: str, request: Request):
+    error = unknown_symbol(symbol)
+    if error is not None:
+        return error
+    from app.sentiment_charts import ensure_chart
+    # Rendered from the day's summary on first request when the pipeline has not drawn it (SENTIMENT_CHARTS=lazy)
+    chart_path = ensure_chart(symbol.upper(), get_today())
+    response = file_response(request, chart_path, "image/png") if chart_path else None
+    if response is not None:
+        return response
     return JSONResponse(content={"error": "Chart not found"}, status_code=404)
 
 # Metrics Section
@@ -74,73 +201,278 @@ def get_chart(symbol: str):
 # LSTM
 @app.get("/metrics/lstm/{symbol}")
 def get_lstm_metrics(symbol: str):
+    error = unknown_symbol(symbol, "lstm")
+    if error is not None:
+        return error
     file_path = f"model-metrics-charts/lstm/metrics/{symbol.upper()}_lstm_model_metrics.csv"
-    if not os.path.exists(file_path):
+    body = snapshot_cache.row(file_path)
+    if body is None:
         return JSONResponse(content={"error": "Metrics not found"}, status_code=404)
-    df = pd.read_csv(file_path)
-    return df.to_dict(orient="records")[0]
+    return Response(content=body, media_type="application/json")
 
 @app.get("/metrics/lstm/chart/tsp/{symbol}")
-def get_chart(symbol: str):
+def get_chart(symbol: str, request: Request):
+    error = unknown_symbol(symbol, "lstm")
+    if error is not None:
+        return error
     chart_path = f"model-metrics-charts/lstm/test_set_predictions/{symbol.upper()}_lstm_test_plot.png"
-    if os.path.exists(chart_path):
-        return FileResponse(chart_path, media_type="image/png")
+    response = file_response(request, chart_path, "image/png")
+    if response is not None:
+        return response
     return JSONResponse(content={"error": "Chart not found"}, status_code=404)
 
 @app.get("/metrics/lstm/chart/tl/{symbol}")
-def get_chart(symbol: str):
+def get_chart(symbol: str, request: Request):
+    error = unknown_symbol(symbol, "lstm")
+    if error is not None:
+        return error
     chart_path = f"model-metrics-charts/lstm/training_loss/{symbol.upper()}_lstm_loss_plot.png"
-    if os.path.exists(chart_path):
-        return FileResponse(chart_path, media_type="image/png")
+    response = file_response(request, chart_path, "image/png")
+    if response is not None:
+        return response
     return JSONResponse(content={"error": "Chart not found"}, status_code=404)
 
 # LSTM Sentiment
 @app.get("/metrics/lstm_sentiment/{symbol}")
 def get_lstm_sentiment_metrics(symbol: str):
+    error = unknown_symbol(symbol, "lstm_sentiment")
+    if error is not None:
+        return error
     file_path = f"model-metrics-charts/lstm_senti/metrics/{symbol.upper()}_lstm_senti_model_metrics.csv"
-    if not os.path.exists(file_path):
+    body = snapshot_cache.row(file_path)
+    if body is None:
         return JSONResponse(content={"error": "Metrics not found"}, status_code=404)
-    df = pd.read_csv(file_path)
-    return df.to_dict(orient="records")[0]
+    return Response(content=body, media_type="application/json")
 
 @app.get("/metrics/lstm_sentiment/chart/tsp/{symbol}")
-def get_chart(symbol: str):
+def get_chart(symbol: str, request: Request):
+    error = unknown_symbol(symbol, "lstm_sentiment")
+    if error is not None:
+        return error
     chart_path = f"model-metrics-charts/lstm_senti/test_set_predictions/{symbol.upper()}_lstm_senti_test_plot.png"
-    if os.path.exists(chart_path):
-        return FileResponse(chart_path, media_type="image/png")
+    response = file_response(request, chart_path, "image/png")
+    if response is not None:
+        return response
     return JSONResponse(content={"error": "Chart not found"}, status_code=404)
 
 @app.get("/metrics/lstm_sentiment/chart/tl/{symbol}")
-def get_chart(symbol: str):
+def get_chart(symbol: str, request: Request):
+    error = unknown_symbol(symbol, "lstm_sentiment")
+    if error is not None:
+        return error
     chart_path = f"model-metrics-charts/lstm_senti/training_loss/{symbol.upper()}_lstm_senti_loss_plot.png"
-    if os.path.exists(chart_path):
-        return FileResponse(chart_path, media_type="image/png")
+    response = file_response(request, chart_path, "image/png")
+    if response is not None:
+        return response
     return JSONResponse(content={"error": "Chart not found"}, status_code=404)
 
 # Prediction Section
 
 @app.get("/predict/lstm")
-def predict_price(symbol: str = Query(...), days: int = Query(60)):
+async def predict_price(symbol: str = Query(...), days: int = Query(60)):
+    error = unknown_symbol(symbol, "lstm")
+    if error is not None:
+        return error
+    # Serve today's precomputed result when it was made with the same window
+    if days == PRECOMPUTED_TIME_STEPS:
+        price = results_index.lookup("lstm", symbol.upper(), get_today())
+        precomputed_lookups.inc(model="lstm", result="hit" if price is not None else "miss")
+        if price is not None:
+            return {
+                "date": get_today(),
+                "stock": symbol.upper(),
+                "predicted_price_for_tommorow": round(price, 2),
+                "source": "precomputed"
+            }
+
     from app.predict_lstm import predict_lstm_price
+    symbol = symbol.upper()
+    # Identical requests in flight share one prediction
+    key = ("lstm", symbol, days, data_version(*dataset_paths([symbol]), symbol_registry.model_path("lstm", symbol)))
     try:
-        price = predict_lstm_price(symbol.upper(), days)
+        price = await inference_pool.run_shared(key, predict_lstm_price, symbol, days)
         return {
             "date": get_today(),
             "stock": symbol.upper(),
-            "predicted_price_for_tommorow": float(round(price, 2))  # Fix: convert numpy.float32 to float
+            "predicted_price_for_tommorow": float(round(price, 2)),  # Fix: convert numpy.float32 to float
+            "source": "live"
         }
+    except InferenceQueueFull as e:
+        return queue_full_response(e)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+@app.get("/predict/lstm/horizon")
+async def predict_price_horizon(
+    symbol: str = Query(..., description="One or more comma-separated symbols"),
+    steps: int = Query(5),
+    days: int = Query(60),
+):
+    from app.horizon import horizon_forecaster
+    if days < 1:
+        return JSONResponse(content={"error": "days must be positive"}, status_code=400)
+    requested = [s.strip().upper() for s in symbol.split(",") if s.strip()]
+    unknown = {s: symbol_error(s, "lstm") for s in requested}
+    unknown = {s: error for s, error in unknown.items() if error is not None}
+    symbol_list = [s for s in requested if s not in unknown]
+    if not symbol_list:
+        return JSONResponse(content={"error": unknown}, status_code=404)
+    key = ("horizon", tuple(symbol_list), steps, days, data_version(*dataset_paths(symbol_list)))
+    try:
+        forecast = await inference_pool.run_shared(key, horizon_forecaster.forecast, symbol_list, steps, days)
+    except InferenceQueueFull as e:
+        return queue_full_response(e)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=400)
+    if not forecast["results"]:
+        return JSONResponse(content={"error": forecast["errors"]}, status_code=400)
+    return live_response({
+        "date": get_today(),
+        "steps": steps,
+        "forecasts": forecast["results"],
+        "errors": {**unknown, **forecast["errors"]},
+    }, forecast["errors"])
 
 @app.get("/predict/lstm_sentiment")
-def predict_price_sentiment(symbol: str = Query(...), days: int = Query(60)):
+async def predict_price_sentiment(symbol: str = Query(...), days: int = Query(60)):
+    error = unknown_symbol(symbol, "lstm_sentiment")
+    if error is not None:
+        return error
+    # Serve today's precomputed result when it was made with the same window
+    if days == PRECOMPUTED_TIME_STEPS:
+        price = results_index.lookup("lstm_sentiment", symbol.upper(), get_today())
+        precomputed_lookups.inc(model="lstm_sentiment", result="hit" if price is not None else "miss")
+        if price is not None:
+            return {
+                "date": get_today(),
+                "stock": symbol.upper(),
+                "predicted_price_for_tommorow": round(price, 2),
+                "source": "precomputed"
+            }
+
     from app.predict_lstm_sentiment import predict_lstm_sentiment_price
+    symbol = symbol.upper()
+    key = ("lstm_sentiment", symbol, days, data_version(
+        *dataset_paths([symbol]),
+        symbol_registry.model_path("lstm_sentiment", symbol),
+        f"sentiments/sentiment/{get_today()}/{symbol}_sentiment.csv",
+    ))
     try:
-        price = predict_lstm_sentiment_price(symbol.upper(), days)
+        price = await inference_pool.run_shared(key, predict_lstm_sentiment_price, symbol, days)
         return {
             "date": get_today(),
             "stock": symbol.upper(),
-            "predicted_price_for_tommorow": float(round(price, 2))  # Fix: convert numpy.float32 to float
+            "predicted_price_for_tommorow": float(round(price, 2)),  # Fix: convert numpy.float32 to float
+            "source": "live"
         }
+    except InferenceQueueFull as e:
+        return queue_full_response(e)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+@app.get("/predict/batch")
+async def predict_batch_prices(
+    symbols: str = Query(None, description="Comma-separated symbols (default: all)"),
+    models: str = Query("lstm,lstm_sentiment"),
+    days: int = Query(60),
+):
+    from app.batch_predict import predict_batch, available_symbols
+    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else available_symbols()
+    model_list = [m.strip() for m in models.split(",") if m.strip()]
+    # Disabled (symbol, model) pairs are reported per symbol and never reach the models
+    unknown = {}
+    for s in symbol_list:
+        for m in model_list:
+            error = symbol_error(s, m)
+            if error is not None:
+                unknown.setdefault(s, {})[m] = error
+    skip = frozenset((m, s) for s, failed in unknown.items() for m in failed)
+    symbol_list = [s for s in symbol_list if len(unknown.get(s, ())) < len(model_list)]
+    key = ("batch", tuple(symbol_list), tuple(model_list), skip, days, data_version(*dataset_paths(symbol_list)))
+    try:
+        # Inline within the slot: an inner thread pool would multiply the INFERENCE_WORKERS limit
+        batch = await inference_pool.run_shared(
+            key, functools.partial(predict_batch, max_workers=1), symbol_list, model_list, days, skip)
+    except InferenceQueueFull as e:
+        return queue_full_response(e)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    errors = {s: dict(failed) for s, failed in unknown.items()}
+    for s, failed in batch["errors"].items():
+        errors.setdefault(s, {}).update(failed)
+    return live_response({
+        "date": get_today(),
+        "days": days,
+        "predictions": {
+            symbol: {family: round(price, 2) for family, price in prices.items()}
+            for symbol, prices in batch["results"].items()
+        },
+        "errors": errors,
+    }, batch["errors"])
+
+@app.get("/backtest/{model}/{symbol}")
+async def backtest(
+    model: str,
+    symbol: str,
+    from_date: str = Query(None, alias="from"),
+    to_date: str = Query(None, alias="to"),
+    time_steps: int = Query(60),
+):
+    from app.backtest import backtester, BACKTEST_MODELS
+    if model not in BACKTEST_MODELS:
+        return JSONResponse(content={"error": f"Unknown model: {model}"}, status_code=400)
+    error = unknown_symbol(symbol, model)
+    if error is not None:
+        return error
+    for value in (from_date, to_date):
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                return JSONResponse(content={"error": f"Invalid date: {value}"}, status_code=400)
+    symbol = symbol.upper()
+    key = ("backtest", model, symbol, from_date, to_date, time_steps, data_version(*dataset_paths([symbol])))
+    try:
+        return await inference_pool.run_shared(key, backtester.run, model, symbol, from_date, to_date, time_steps)
+    except InferenceQueueFull as e:
+        return queue_full_response(e)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=400)
+
+@app.get("/accuracy/{symbol}")
+def symbol_accuracy(symbol: str):
+    error = unknown_symbol(symbol)
+    if error is not None:
+        return error
+    from app.accuracy import accuracy_engine
+    accuracy = accuracy_engine.symbol_accuracy(symbol.upper())
+    if accuracy is None:
+        return JSONResponse(content={"error": "No scored predictions for this symbol"}, status_code=404)
+    return accuracy
+
+@app.get("/predictions/history/{symbol}")
+def prediction_history(
+    symbol: str,
+    from_date: str = Query(None, alias="from"),
+    to_date: str = Query(None, alias="to"),
+    model: str = Query(None),
+):
+    error = unknown_symbol(symbol)
+    if error is not None:
+        return error
+    if model is not None and model not in RESULT_FILES:
+        return JSONResponse(content={"error": f"Unknown model: {model}"}, status_code=400)
+    for value in (from_date, to_date):
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                return JSONResponse(content={"error": f"Invalid date: {value}"}, status_code=400)
+    return {
+        "stock": symbol.upper(),
+        "from": from_date,
+        "to": to_date,
+        "predictions": results_index.history(symbol.upper(), model, from_date, to_date),
+    }
+
+startup.record("import_api", pytime.perf_counter() - IMPORT_STARTED)
@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+# === Configuration ===
+CACHE_PATH = os.getenv("ARTICLE_CACHE_PATH", "cache/article_scores.sqlite")
+MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "200000"))
+_CHUNK = 500  # stays below SQLite's bound-parameter limit
+
+
+class ArticleScoreCache:
+    """Persistent FinBERT scores keyed by a hash of the scored text.
+
+    Entries are namespaced by model/backend so a quantized run never serves
+    full-precision scores (or vice versa). Once the table grows past
+    max_entries, the least recently used rows are evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, namespace=""):
+        self.path = path
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self._conn.commit()
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Return a list aligned with texts holding cached results or None."""
+        keys = [self.key(t) for t in texts]
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), _CHUNK):
+                chunk = unique[start:start + _CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, label, score FROM scores WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update({k: {"label": label, "score": score} for k, label, score in rows})
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?",
+                                       [(now, k) for k in found])
+                self._conn.commit()
+        return [found.get(k) for k in keys]
+
+    def put_many(self, texts, results):
+        """Store scores for texts and evict the oldest rows beyond max_entries."""
+        now = time.time()
+        rows = [(self.key(t), r["label"], float(r["score"]), now) for t, r in zip(texts, results)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        if not self.max_entries:
+            return
+        excess = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)", (excess,)
+            )
+
+
+def score_with_cache(texts, engine, cache):
+    """Score texts, sending only cache misses (de-duplicated) to the engine.
+
+    Returns (results aligned with texts, {"total", "hits", "scored"}).
+    """
+    results = cache.get_many(texts)
+    misses = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+
+    scored = {}
+    if misses:
+        fresh = engine.score(misses)
+        cache.put_many(misses, fresh)
+        scored = dict(zip(misses, fresh))
+
+    hits = sum(r is not None for r in results)
+    results = [r if r is not None else scored[t] for t, r in zip(texts, results)]
+    return results, {"total": len(texts), "hits": hits, "scored": len(misses)}
@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# === Configuration ===
+BACKTEST_BATCH_SIZE = int(os.getenv("BACKTEST_BATCH_SIZE", "1024"))
+BACKTEST_CACHE_MAX_ENTRIES = int(os.getenv("BACKTEST_CACHE_MAX_ENTRIES", "128"))
+
+# Backtest model name -> model_cache family
+BACKTEST_MODELS = {
+    "lstm": "lstm",
+    "lstm_sentiment": "lstm_senti",
+}
+
+
+def file_version(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def sentiment_features(series, dates, scores):
+    """Scaled sentiment column aligned with series.dates (0 where no score), as in the live predictor."""
+    column = np.zeros(len(series))
+    if len(dates):
+        pos = np.searchsorted(dates, series.dates).clip(max=len(dates) - 1)
+        found = dates[pos] == series.dates
+        column[found] = scores[pos[found]]
+    scale = (column.max() - column.min()) or 1.0
+    return (column - column.min()) / scale
+
+
+def window_view(features, time_steps):
+    """All (n - time_steps + 1, time_steps, n_features) windows as a strided view, no copy."""
+    windows = sliding_window_view(features, time_steps, axis=0)  # (n - ts + 1, n_features, ts)
+    return windows.transpose(0, 2, 1)
+
+
+def score(actual, predicted, previous):
+    """MAE, MAPE and directional accuracy of next-day predictions."""
+    errors = predicted - actual
+    moved = np.sign(actual - previous)
+    called = np.sign(predicted - previous)
+    return {
+        "mae": round(float(np.abs(errors).mean()), 4),
+        "mape": round(float((np.abs(errors) / np.abs(actual)).mean() * 100), 4),
+        "rmse": round(float(np.sqrt((errors ** 2).mean())), 4),
+        "directional_accuracy": round(float((moved == called).mean() * 100), 2),
+    }
+
+
+class Backtester:
+    """Replays a model over the stored price history in large batches.
+
+    Every window ending the day before a target date in [start, end] is
+    predicted at once; results are cached per (model file version, dataset
+    version, sentiment files, range, time_steps).
+    """
+
+    def __init__(self, batch_size=BACKTEST_BATCH_SIZE, max_entries=BACKTEST_CACHE_MAX_ENTRIES):
+        self.batch_size = max(1, batch_size)
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, model, symbol, start=None, end=None, time_steps=60):
+        """Backtest model on symbol for target dates in [start, end] (YYYY-MM-DD, inclusive)."""
+        from app.model_cache import model_cache, model_path
+        from app.price_store import price_store
+
+        if model not in BACKTEST_MODELS:
+            raise ValueError(f"Unknown model: {model}")
+        if time_steps < 1:
+            raise ValueError("time_steps must be positive")
+
+        path = model_path(BACKTEST_MODELS[model], symbol)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
+        series = price_store.get(symbol)
+
+        sentiment = None
+        sentiment_version = ()
+        if model == "lstm_sentiment":
+            from app.columnar_store import columnar_store
+            *sentiment, sentiment_version = columnar_store.sentiment_history(symbol)
+
+        key = (model, symbol, start, end, time_steps, file_version(path), series.mtime, sentiment_version)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        # Window i covers days [i, i + ts) and predicts day i + ts
+        targets = series.dates[time_steps:]
+        lo = np.searchsorted(targets, np.datetime64(start, "D")) if start else 0
+        hi = np.searchsorted(targets, np.datetime64(end, "D"), side="right") if end else len(targets)
+        if hi <= lo:
+            raise ValueError("Not enough data in the requested range")
+
+        scaled_close = (series.close - series.min) / series.scale
+        features = scaled_close[:, None]
+        if sentiment is not None:
+            features = np.stack([scaled_close, sentiment_features(series, *sentiment)], axis=1)
+        windows = window_view(features, time_steps)[lo:hi]
+
+        keras_model = model_cache.get(path)
+        scaled = np.concatenate([
+            np.asarray(keras_model(windows[i:i + self.batch_size], training=False)).reshape(-1)
+            for i in range(0, len(windows), self.batch_size)
+        ])
+
+        predicted = series.inverse(scaled)
+        actual = series.close[time_steps + lo:time_steps + hi]
+        previous = series.close[time_steps + lo - 1:time_steps + hi - 1]
+
+        result = {
+            "model": model,
+            "stock": symbol,
+            "time_steps": time_steps,
+            "from": str(targets[lo]),
+            "to": str(targets[hi - 1]),
+            "predictions": int(hi - lo),
+            **score(actual, predicted, previous),
+        }
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+
+backtester = Backtester()
@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.predict_lstm import build_lstm_input
+from app.predict_lstm_sentiment import build_lstm_sentiment_input
+from app.metrics import model_predict_seconds
+
+# Model family name -> input builder (model, window, price series)
+MODEL_FAMILIES = {
+    "lstm": build_lstm_input,
+    "lstm_sentiment": build_lstm_sentiment_input,
+}
+BATCH_WORKERS = int(os.getenv("BATCH_PREDICT_WORKERS", "4"))
+
+
+def available_symbols():
+    """Return every tracked symbol that has the LSTM model enabled and on disk."""
+    from app.symbols import symbol_registry
+
+    return sorted(
+        symbol for symbol in symbol_registry.symbols("lstm")
+        if os.path.exists(symbol_registry.model_path("lstm", symbol))
+    )
+
+
+def _predict_one(family, symbol, time_steps):
+    model, window, series = MODEL_FAMILIES[family](symbol, time_steps)
+    # Calling the model directly skips predict()'s per-call dataset/callback setup
+    with model_predict_seconds.time(family=family):
+        scaled = np.asarray(model(window, training=False))
+    return float(series.inverse(scaled)[0][0])
+
+
+def predict_batch(symbols, models=None, time_steps=60, skip=(), max_workers=BATCH_WORKERS):
+    """Predict next-day prices for several symbols and model families in one call.
+
+    Returns {"results": {symbol: {family: price}}, "errors": {symbol: {family: message}}};
+    a failure for one symbol or family never affects the others. (family, symbol)
+    pairs in skip are not predicted. With max_workers=1 every pair runs in the
+    calling thread (the API does this, so a batch holds exactly one inference slot).
+    """
+    models = list(models or MODEL_FAMILIES)
+    unknown = [m for m in models if m not in MODEL_FAMILIES]
+    if unknown:
+        raise ValueError(f"Unknown model(s): {', '.join(unknown)}")
+
+    symbols = list(dict.fromkeys(symbols))  # de-duplicate, keep order
+    results = {symbol: {} for symbol in symbols}
+    errors = {}
+
+    def record(family, symbol, predict):
+        try:
+            results[symbol][family] = predict()
+        except Exception as e:
+            errors.setdefault(symbol, {})[family] = str(e)
+
+    # Each (family, symbol) pair has its own network, so one forward pass per pair
+    jobs = [(family, symbol) for family in models for symbol in symbols if (family, symbol) not in skip]
+    if max_workers <= 1 or len(jobs) <= 1:
+        for family, symbol in jobs:
+            record(family, symbol, lambda: _predict_one(family, symbol, time_steps))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+            futures = {job: pool.submit(_predict_one, job[0], job[1], time_steps) for job in jobs}
+            for (family, symbol), future in futures.items():
+                record(family, symbol, future.result)
+
+    return {"results": results, "errors": errors}
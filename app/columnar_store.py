@@ -0,0 +1,574 @@
+import io
+import os
+import glob
+import json
+import uuid
+import fcntl
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+# === Configuration ===
+STORE_DIR = os.getenv("COLUMNAR_STORE_DIR", "store")
+DATASET_DIR = "datasets"
+SENTIMENT_DIR = "sentiments/sentiment"
+RESULTS_DIR = "results"
+# Daily prediction file -> model name (same names as results_index)
+PREDICTION_FILES = {"lstm": "lstm.csv", "lstm_sentiment": "lstm_senti.csv"}
+
+FEATURE_COLUMNS = ["date", "close", "sentiment"]
+PRICE_COLUMNS = {"Date": "date", "Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+# Label -> score; the CSVs store lower-case labels, so lookups upper-case them first
+SENTIMENT_SCORES = {"POSITIVE": 1.0, "NEGATIVE": -1.0, "NEUTRAL": 0.0}
+# Bumped when the way feature columns are computed changes, so tables built the old way are rebuilt
+FEATURES_FORMAT = 2
+
+
+def file_version(path):
+    """[mtime_ns, size] of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def append_npy(path, values, rows):
+    """Append rows to a 1-D .npy file holding `rows` valid values, in place when the header still fits.
+
+    Values past `rows` (left by a writer that died before publishing meta)
+    are dropped first, so every column of a table grows from the same row count.
+    """
+    fmt = np.lib.format
+    with open(path, "r+b") as f:
+        version = fmt.read_magic(f)
+        read_header = fmt.read_array_header_1_0 if version == (1, 0) else fmt.read_array_header_2_0
+        _, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+        values = np.ascontiguousarray(values, dtype=dtype)
+
+        # np.save pads the header so the row count can grow without moving the data
+        header = io.BytesIO()
+        (fmt.write_array_header_1_0 if version == (1, 0) else fmt.write_array_header_2_0)(
+            header, {"descr": fmt.dtype_to_descr(dtype), "fortran_order": fortran_order, "shape": (rows + len(values),)})
+        if header.tell() == offset:
+            f.truncate(offset + rows * dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(values.tobytes())
+            f.seek(0)
+            f.write(header.getvalue())
+            return
+    # Header grew (very old file): rewrite the whole column
+    save_npy(path, np.concatenate([np.load(path)[:rows], values]))
+
+
+def save_npy(path, values):
+    """Atomically replace path; the temp file name is unique, so concurrent writers never share it."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class TableLock:
+    """Serialises writers of one table: a thread lock plus an flock on {directory}/.lock.
+
+    The flock covers other processes (API workers, the scheduler, spawned
+    pipeline workers). Re-entrant within a thread, so a locked caller can
+    use helpers that lock too.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def __enter__(self):
+        self._rlock.acquire()
+        try:
+            if self._depth == 0:
+                os.makedirs(self.directory, exist_ok=True)
+                handle = open(os.path.join(self.directory, ".lock"), "a")
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                except BaseException:
+                    handle.close()
+                    raise
+                self._handle = handle
+            self._depth += 1
+        except BaseException:
+            self._rlock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            self._handle.close()  # releases the flock
+            self._handle = None
+        self._rlock.release()
+
+
+_table_locks = {}
+_table_locks_guard = threading.Lock()
+
+
+def table_lock(directory):
+    with _table_locks_guard:
+        return _table_locks.setdefault(os.path.abspath(directory), TableLock(directory))
+
+
+class ColumnTable:
+    """A directory of equally long .npy columns plus meta.json ({rows, sources, generation} and any extra fields).
+
+    write() saves the columns under file names of a new generation and only
+    then swaps meta.json, so a reader sees the old or the new table, never a
+    mix; append() grows the current files in place and readers stop at the
+    row count in meta. Writers must hold table_lock(directory).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def meta(self):
+        try:
+            with open(os.path.join(self.directory, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def column_path(self, name, generation=None):
+        # Tables written before generations existed use plain {name}.npy
+        return os.path.join(self.directory, f"{name}.{generation}.npy" if generation else f"{name}.npy")
+
+    def read(self, names, mmap=True):
+        """Return {name: array} (memory-mapped), or None if missing or half-written."""
+        return self.read_with_meta(names, mmap)[0]
+
+    def read_with_meta(self, names, mmap=True):
+        """(columns, meta) of one consistent version of the table, or (None, None)."""
+        # A writer may publish a new generation (removing these files) or rewrite a header mid-read; retry briefly
+        for _ in range(5):
+            meta = self.meta()
+            if meta is None:
+                return None, None
+            columns = self._read(meta, names, mmap)
+            if columns is not None:
+                return columns, meta
+        return None, None
+
+    def _read(self, meta, names, mmap):
+        columns = {}
+        for name in names:
+            try:
+                column = np.load(self.column_path(name, meta.get("generation")), mmap_mode="r" if mmap else None)
+            except (OSError, ValueError):
+                return None
+            if len(column) < meta["rows"]:
+                return None
+            columns[name] = column[:meta["rows"]]
+        return columns
+
+    def write(self, columns, sources, **extra):
+        os.makedirs(self.directory, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        for name, values in columns.items():
+            np.save(self.column_path(name, generation), values)
+        self._write_meta(len(next(iter(columns.values()))), sources, {**extra, "generation": generation})
+        # Readers that already mapped the old files keep them until they let go
+        for path in glob.glob(os.path.join(self.directory, "*.npy")):
+            if not path.endswith(f".{generation}.npy"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def append(self, columns, sources, **extra):
+        meta = self.meta()
+        if meta is None:
+            return self.write(columns, sources, **extra)
+        for name, values in columns.items():
+            append_npy(self.column_path(name, meta.get("generation")), values, meta["rows"])
+        kept = {k: v for k, v in meta.items() if k not in ("rows", "sources")}
+        self._write_meta(meta["rows"] + len(next(iter(columns.values()))), {**meta["sources"], **sources},
+                         {**kept, **extra})
+
+    def upsert_day(self, key_column, day, columns, source, names):
+        """Replace the rows whose key_column equals day; appends when day is the newest."""
+        meta = self.meta()
+        existing = self.read(names, mmap=False) if meta else None
+        day64 = np.datetime64(day, "D")
+        if existing is None:
+            return self.write(columns, {day: source})
+        if day not in meta["sources"] and (not len(existing[key_column]) or existing[key_column].max() < day64):
+            return self.append(columns, {day: source})
+        keep = existing[key_column] != day64
+        merged = {name: np.concatenate([existing[name][keep], columns[name]]) for name in names}
+        order = np.argsort(merged[key_column], kind="stable")
+        self.write({name: values[order] for name, values in merged.items()}, {**meta["sources"], day: source})
+
+    def _write_meta(self, rows, sources, extra=None):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".meta.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"rows": int(rows), "sources": sources, **(extra or {})}, f)
+            os.replace(tmp_path, os.path.join(self.directory, "meta.json"))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class ColumnarStore:
+    """Per-symbol columnar copies of the CSV datasets, sentiment and predictions.
+
+    The CSV tree stays the source of truth (it is what the daily git sync
+    pushes); here each column is one memory-mappable .npy file, so a symbol's
+    full history is a few mmaps instead of one CSV per day. Every table
+    records the (mtime, size) of the CSVs it was built from and is rebuilt
+    when they change, so a stale or missing store never serves wrong data.
+
+    Layout: prices/{symbol}/, sentiment/{symbol}/, features/{symbol}/, predictions/{model}/{symbol}/
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def _lock(self, directory):
+        return table_lock(directory)
+
+    # === Prices ===
+    def prices(self, symbol, csv_path=None):
+        """Columns of a symbol's daily bars, rebuilt from the CSV when it has changed (for the jobs)."""
+        csv_path = csv_path or os.path.join(DATASET_DIR, f"{symbol}_daily_data.csv")
+        table = ColumnTable(os.path.join(self.root, "prices", symbol))
+        version = file_version(csv_path)
+        if version is None:
+            raise FileNotFoundError(f"Stock data file not found: {csv_path}")
+
+        if not self.is_current(symbol, csv_path, version):
+            with self._lock(table.directory):
+                if not self.is_current(symbol, csv_path, version):
+                    self.write_prices(symbol, csv_path)
+        columns = table.read(PRICE_COLUMNS.values())
+        if columns is None:
+            raise ValueError(f"Columnar store for {symbol} is unreadable: {table.directory}")
+        return columns
+
+    def read_prices(self, symbol, csv_path=None):
+        """Columns of a symbol's daily bars without writing: the stored table if current, else parsed from the CSV."""
+        csv_path = csv_path or os.path.join(DATASET_DIR, f"{symbol}_daily_data.csv")
+        version = file_version(csv_path)
+        if version is None:
+            raise FileNotFoundError(f"Stock data file not found: {csv_path}")
+        columns, meta = ColumnTable(os.path.join(self.root, "prices", symbol)).read_with_meta(PRICE_COLUMNS.values())
+        if columns is not None and meta["sources"].get("csv") == version:
+            return columns
+        import pandas as pd
+
+        return self._price_columns(pd.read_csv(csv_path))
+
+    def is_current(self, symbol, csv_path, version=None):
+        """True when the stored prices were built from the CSV as it is now."""
+        meta = ColumnTable(os.path.join(self.root, "prices", symbol)).meta()
+        return meta is not None and meta["sources"].get("csv") == (version or file_version(csv_path))
+
+    def write_prices(self, symbol, csv_path, new_rows=None):
+        """Store a symbol's bars; with new_rows (the rows just appended to the CSV) only those are appended."""
+        table = ColumnTable(os.path.join(self.root, "prices", symbol))
+        sources = {"csv": file_version(csv_path)}
+        import pandas as pd
+
+        with self._lock(table.directory):
+            if new_rows is not None and table.meta() is not None:
+                # Parse the rows exactly as a full CSV read would (same float rounding)
+                new_rows = pd.read_csv(io.StringIO(new_rows.to_csv(index=False)))
+                table.append(self._price_columns(new_rows), sources)
+            else:
+                table.write(self._price_columns(pd.read_csv(csv_path)), sources)
+
+    @staticmethod
+    def _price_columns(df):
+        import pandas as pd
+
+        df = df.dropna(subset=["Date", "Close"])
+        columns = {"date": pd.to_datetime(df["Date"]).values.astype("datetime64[D]")}
+        for csv_name, name in PRICE_COLUMNS.items():
+            if name != "date":
+                columns[name] = pd.to_numeric(df[csv_name], errors="coerce").to_numpy(dtype=np.float64) \
+                    if csv_name in df else np.full(len(df), np.nan)
+        return columns
+
+    # === Sentiment ===
+    def daily_sentiment(self, symbol, day):
+        """(dates, mean daily score) of the articles collected on day for symbol."""
+        columns, _ = self.sentiment_columns(symbol, days=[day])
+        rows = columns["collected"] == np.datetime64(day, "D")
+        return daily_scores(columns["date"][rows], columns["label"][rows])
+
+    def sentiment_history(self, symbol):
+        """(dates, scores, version) merged over every collection day; newer days win."""
+        columns, versions = self.sentiment_columns(symbol)
+        dates, scores = merge_collections(columns)
+        return dates, scores, json.dumps(versions, sort_keys=True)
+
+    def write_sentiment_day(self, symbol, day, csv_path=None):
+        """Store (or replace) the articles collected on day for symbol."""
+        import pandas as pd
+
+        csv_path = csv_path or os.path.join(SENTIMENT_DIR, day, f"{symbol}_sentiment.csv")
+        columns = self._sentiment_day_columns(day, csv_path)
+        table = ColumnTable(os.path.join(self.root, "sentiment", symbol))
+        with self._lock(table.directory):
+            table.upsert_day("collected", day, columns, file_version(csv_path), list(columns))
+
+    @staticmethod
+    def _sentiment_day_columns(day, csv_path):
+        import pandas as pd
+
+        df = pd.read_csv(csv_path, usecols=["date", "sentiment", "confidence"])
+        return {
+            "collected": np.full(len(df), np.datetime64(day, "D")),
+            "date": pd.to_datetime(df["date"], errors="coerce").values.astype("datetime64[D]"),
+            "label": df["sentiment"].fillna("").astype(str).to_numpy(dtype="U16"),
+            "confidence": pd.to_numeric(df["confidence"], errors="coerce").to_numpy(dtype=np.float64),
+        }
+
+    def ingest_sentiment(self, symbol):
+        """Store every collection day of symbol whose sentiment CSV is new or changed (e.g. after a git pull)."""
+        stored = (ColumnTable(os.path.join(self.root, "sentiment", symbol)).meta() or {}).get("sources", {})
+        for csv_path in sorted(glob.glob(os.path.join(SENTIMENT_DIR, "*", f"{symbol}_sentiment.csv"))):
+            day = os.path.basename(os.path.dirname(csv_path))
+            if stored.get(day) != file_version(csv_path):
+                self.write_sentiment_day(symbol, day, csv_path)
+
+    def sentiment_columns(self, symbol, days=None):
+        """(columns, {day: csv version}) of symbol's scored articles, without writing.
+
+        days limits the freshness check to those collection days; None checks
+        every day on disk. When the stored table is behind those CSVs, the
+        columns are parsed from the CSVs instead (the jobs re-ingest them).
+        """
+        if days is None:
+            days = sorted(os.path.basename(os.path.dirname(p))
+                          for p in glob.glob(os.path.join(SENTIMENT_DIR, "*", f"{symbol}_sentiment.csv")))
+        versions = {}
+        for day in days:
+            csv_path = os.path.join(SENTIMENT_DIR, day, f"{symbol}_sentiment.csv")
+            versions[day] = file_version(csv_path)
+            if versions[day] is None:
+                raise FileNotFoundError(f"Sentiment file not found: {csv_path}")
+
+        names = ["collected", "date", "label", "confidence"]
+        columns, meta = ColumnTable(os.path.join(self.root, "sentiment", symbol)).read_with_meta(names)
+        if columns is not None and all(meta["sources"].get(day) == version for day, version in versions.items()):
+            return columns, versions
+        parts = [self._sentiment_day_columns(day, os.path.join(SENTIMENT_DIR, day, f"{symbol}_sentiment.csv"))
+                 for day in days]
+        if not parts:
+            empty = np.array([], dtype="datetime64[D]")
+            return {"collected": empty, "date": empty, "label": np.array([], dtype="U16"),
+                    "confidence": np.array([])}, versions
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}, versions
+
+    # === Features ===
+    def features(self, symbol, day=None):
+        """(Date, Close, Sentiment) columns of symbol and their scaling bounds, without writing.
+
+        Served from the feature table when it was built from the current price
+        CSV and (with day, the predictor's collection day) that day's sentiment
+        CSV. Otherwise the same columns are computed in memory from the CSVs;
+        the table itself is brought up to date by update_features in the jobs.
+        """
+        price_version = file_version(os.path.join(DATASET_DIR, f"{symbol}_daily_data.csv"))
+        columns, meta = ColumnTable(os.path.join(self.root, "features", symbol)).read_with_meta(FEATURE_COLUMNS)
+        if (columns is not None and price_version is not None and meta["sources"]["prices"] == price_version
+                and meta["sources"].get("format") == FEATURES_FORMAT
+                and (day is None or meta["sources"]["sentiment"].get(day)
+                     == file_version(os.path.join(SENTIMENT_DIR, day, f"{symbol}_sentiment.csv")))):
+            return columns, meta["bounds"]
+
+        prices = self.read_prices(symbol)
+        sentiment = np.zeros(len(prices["date"]))
+        place_scores(prices["date"], sentiment, *merge_collections(self.sentiment_columns(symbol)[0]))
+        columns = {"date": prices["date"], "close": prices["close"], "sentiment": sentiment}
+        return columns, feature_bounds(prices["close"], sentiment)
+
+    def update_features(self, symbol):
+        """Bring the feature table up to date with the stored prices and sentiment.
+
+        New price rows are appended with their sentiment, and newly collected
+        days only rewrite the sentiment of the dates they cover; a rewritten
+        price history or a re-scored older day rebuilds the table. Dates
+        without a score get 0, and the newest collection covering a date wins.
+        """
+        table = ColumnTable(os.path.join(self.root, "features", symbol))
+        prices = self.prices(symbol)
+        self.ingest_sentiment(symbol)
+        with self._lock(table.directory):
+            sources = self._feature_sources(symbol)
+            meta = table.meta()
+            if meta is not None and meta["sources"] == sources:
+                return
+            existing = table.read(FEATURE_COLUMNS, mmap=False) if meta else None
+            collected = sources["sentiment"]
+            applied = meta["sources"]["sentiment"] if existing is not None else {}
+            changed = sorted(day for day, version in collected.items() if applied.get(day) != version)
+
+            kept = len(existing["date"]) if existing is not None else 0
+            incremental = (
+                existing is not None
+                and meta["sources"].get("format") == FEATURES_FORMAT
+                and kept <= len(prices["date"])
+                and np.array_equal(existing["date"], prices["date"][:kept])
+                and np.array_equal(existing["close"], prices["close"][:kept])
+                and applied.keys() <= collected.keys()
+                and all(day > max(applied, default="") for day in changed)
+            )
+            if not incremental:
+                kept, changed = 0, sorted(collected)
+
+            sentiment = np.zeros(len(prices["date"]))
+            if kept:
+                sentiment[:kept] = existing["sentiment"]
+            # Only days collected on or after the first new price date can score the new rows
+            since = str(prices["date"][kept]) if kept < len(prices["date"]) else None
+            days = set(changed) | {day for day in collected if since is not None and day >= since}
+            if days:
+                stored = self._sentiment_columns(symbol)
+                place_scores(prices["date"], sentiment, *merge_collections(stored, sorted(days)))
+
+            bounds = feature_bounds(prices["close"], sentiment)
+            columns = {"date": prices["date"], "close": prices["close"], "sentiment": sentiment}
+            if kept and not changed:
+                table.append({name: values[kept:] for name, values in columns.items()}, sources, bounds=bounds)
+            else:
+                table.write(columns, sources, bounds=bounds)
+
+    def _feature_sources(self, symbol):
+        """What a current feature table was built from: the price CSV version and every ingested sentiment day."""
+        prices = ColumnTable(os.path.join(self.root, "prices", symbol)).meta() or {"sources": {}}
+        sentiment = ColumnTable(os.path.join(self.root, "sentiment", symbol)).meta() or {"sources": {}}
+        return {"prices": prices["sources"].get("csv"), "sentiment": sentiment["sources"], "format": FEATURES_FORMAT}
+
+    def _sentiment_columns(self, symbol):
+        columns = ColumnTable(os.path.join(self.root, "sentiment", symbol)).read(["collected", "date", "label"])
+        if columns is None:
+            empty = np.array([], dtype="datetime64[D]")
+            return {"collected": empty, "date": empty, "label": np.array([], dtype="U16")}
+        return columns
+
+    # === Predictions ===
+    def predictions(self, model, symbol):
+        """(dates, prices) of the saved daily predictions of model for symbol."""
+        columns = ColumnTable(os.path.join(self.root, "predictions", model, symbol)).read(["date", "price"])
+        if columns is None:
+            return np.array([], dtype="datetime64[D]"), np.array([])
+        return columns["date"], columns["price"]
+
+    def prediction_days(self, model):
+        """{day: csv version} for every day already stored for model."""
+        days = {}
+        for meta_path in glob.glob(os.path.join(self.root, "predictions", model, "*", "meta.json")):
+            meta = ColumnTable(os.path.dirname(meta_path)).meta() or {}
+            days.update(meta.get("sources", {}))
+        return days
+
+    def write_predictions_day(self, day, model, csv_path=None):
+        """Store one day's predictions of model (read from its results CSV)."""
+        import pandas as pd
+
+        csv_path = csv_path or os.path.join(RESULTS_DIR, day, PREDICTION_FILES[model])
+        df = pd.read_csv(csv_path)
+        prices = pd.to_numeric(df["predicted_price"], errors="coerce")
+        version = file_version(csv_path)
+        for symbol, price in zip(df["symbol"], prices):
+            if price != price:  # failed prediction, no price recorded
+                continue
+            table = ColumnTable(os.path.join(self.root, "predictions", model, symbol))
+            columns = {"date": np.array([day], dtype="datetime64[D]"), "price": np.array([price], dtype=np.float64)}
+            with self._lock(table.directory):
+                table.upsert_day("date", day, columns, version, ["date", "price"])
+
+    # === Migration ===
+    def migrate(self, log=print):
+        """Build the whole store from the existing CSV tree."""
+        for csv_path in sorted(glob.glob(os.path.join(DATASET_DIR, "*_daily_data.csv"))):
+            symbol = os.path.basename(csv_path)[:-len("_daily_data.csv")]
+            self.write_prices(symbol, csv_path)
+        log("✅ Migrated price datasets")
+
+        for csv_path in sorted(glob.glob(os.path.join(SENTIMENT_DIR, "*", "*_sentiment.csv"))):
+            day = os.path.basename(os.path.dirname(csv_path))
+            symbol = os.path.basename(csv_path)[:-len("_sentiment.csv")]
+            self.write_sentiment_day(symbol, day, csv_path)
+        log("✅ Migrated sentiment history")
+
+        for csv_path in sorted(glob.glob(os.path.join(DATASET_DIR, "*_daily_data.csv"))):
+            self.update_features(os.path.basename(csv_path)[:-len("_daily_data.csv")])
+        log("✅ Migrated sentiment feature tables")
+
+        for model, filename in PREDICTION_FILES.items():
+            for csv_path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*", filename))):
+                self.write_predictions_day(os.path.basename(os.path.dirname(csv_path)), model, csv_path)
+        log("✅ Migrated saved predictions")
+
+
+def merge_collections(columns, days=None):
+    """(dates, scores) merged over collection days (all by default); a newer day overrides the dates it covers."""
+    merged = {}
+    for day in np.unique(columns["collected"]) if days is None else np.array(days, dtype="datetime64[D]"):
+        rows = columns["collected"] == day
+        dates, scores = daily_scores(columns["date"][rows], columns["label"][rows])
+        merged.update(zip(dates.tolist(), scores.tolist()))
+    dates = np.array(sorted(merged), dtype="datetime64[D]")
+    scores = np.array([merged[d] for d in dates.tolist()], dtype=np.float64)
+    return dates, scores
+
+
+def place_scores(price_dates, sentiment, dates, scores):
+    """Write scores into sentiment at the positions of their dates in price_dates (dates without a price are dropped)."""
+    pos = np.searchsorted(price_dates, dates)
+    inside = pos < len(price_dates)
+    found = np.zeros(len(dates), dtype=bool)
+    found[inside] = price_dates[pos[inside]] == dates[inside]
+    sentiment[pos[found]] = scores[found]
+
+
+def feature_bounds(close, sentiment):
+    """Scaling bounds over the full history, so a request only has to read the tail."""
+    if not len(sentiment):
+        return {"close": [0.0, 0.0], "sentiment": [0.0, 0.0]}
+    return {
+        "close": [float(close.min()), float(close.max())],
+        "sentiment": [float(sentiment.min()), float(sentiment.max())],
+    }
+
+
+def daily_scores(dates, labels):
+    """Mean sentiment score per article date; days without a mapped label score 0."""
+    scores = np.array([SENTIMENT_SCORES.get(label.upper(), np.nan) for label in labels.tolist()], dtype=np.float64)
+    known = ~np.isnat(dates)
+    days, inverse = np.unique(dates[known], return_inverse=True)
+    scores = scores[known]
+    valid = ~np.isnan(scores)
+    sums = np.bincount(inverse[valid], weights=scores[valid], minlength=len(days))
+    counts = np.bincount(inverse[valid], minlength=len(days))
+    means = np.divide(sums, counts, out=np.zeros(len(days)), where=counts > 0)
+    return days.astype("datetime64[D]"), means
+
+
+columnar_store = ColumnarStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar (.npy) copies of the CSV datasets.")
+    parser.add_argument("command", choices=["migrate"], help="migrate: build the store from the CSV tree")
+    args = parser.parse_args()
+    columnar_store.migrate()
@@ -1,72 +1,200 @@
-import yfinance as yf
 import os
-from datetime import datetime
+import time
+import shutil
+import argparse
+import contextvars
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from app.columnar_store import columnar_store
+from app.job_log import get_logger
+from app.symbols import symbol_registry
 
 # === Configuration ===
-stocks = [
-    "AMZN",        # Amazon
-    "AAPL",        # Apple
-    "GOOGL",       # Alphabet (Class A)
-    "005930.KS",   # Samsung Electronics
-    "2317.TW",     # Foxconn (Taiwan)
-    "MSFT",        # Microsoft
-    "JD",          # JD.com
-    "BABA",        # Alibaba
-    "T",           # AT&T
-    "META"         # Meta (Facebook)
-]
-
 def get_today():
     return datetime.today().strftime("%Y-%m-%d")
 
 start_date = '2000-01-01'
-end_date = datetime.today().strftime('%Y-%m-%d')
 output_dir = "datasets"
-today = get_today()
-log_dir = "logs"
-log_file = os.path.join(log_dir, f"{today}.log")
-
-os.makedirs(output_dir, exist_ok=True)
-os.makedirs(log_dir, exist_ok=True)
+columns = ["Date", "Close", "High", "Low", "Open", "Volume"]
+download_workers = int(os.getenv("DOWNLOAD_WORKERS", "4"))
 
 # === Logging Helper ===
-def log(message):
-    print(message)
-    with open(log_file, "a") as f:
-        f.write(f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
+log = get_logger("download_datasets")
 
-log("🟢 Dataset download started")
+# === Data Sources ===
+# A fetcher is any callable (symbol, start, end) -> DataFrame with a "Date"
+# column plus OHLCV columns, covering start (inclusive) to end (exclusive).
 
-# === Download & Save ===
-for symbol in stocks:
-    log(f"⬇️ Downloading data for {symbol}...")
+def yfinance_fetcher(symbol, start, end):
+    """Fetch daily bars from Yahoo Finance."""
+    import yfinance as yf
+
+    # Ticker.history keeps no shared state, unlike yf.download, so it is safe across threads
+    df = yf.Ticker(symbol).history(start=start, end=end, interval="1d", auto_adjust=True)
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = "Date"
+    return df.reset_index()
+
+class LocalCsvFetcher:
+    """Serve bars from a directory of {symbol}_daily_data.csv files (offline runs and tests)."""
+
+    def __init__(self, source_dir):
+        self.source_dir = source_dir
+
+    def __call__(self, symbol, start, end):
+        path = os.path.join(self.source_dir, f"{symbol}_daily_data.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns)
+        df = pd.read_csv(path, float_precision="round_trip")
+        dates = df["Date"].astype(str).str[:10]
+        return df[(dates >= start) & (dates < end)]
+
+# === Helpers ===
+def last_stored_row(path):
+    """Return the fields of the last row of a dataset CSV without parsing the whole file."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines:
+        return None
+    return lines[-1].decode().split(",")
+
+def last_stored_date(path):
+    """Return the Date of the last row of a dataset CSV, or None for a missing or header-only file."""
+    row = last_stored_row(path)
+    if not row:
+        return None
     try:
-        df = yf.download(symbol, start=start_date, end=end_date, interval='1d')
-        if df.empty:
-            raise ValueError("No data returned")
-        df.reset_index(inplace=True)
-        df.to_csv(f"{output_dir}/{symbol}_daily_data.csv", index=False)
-        log(f"✅ Saved {symbol} to {output_dir}/{symbol}_daily_data.csv")
-    except Exception as e:
-        log(f"❌ Failed to download {symbol}: {e}")
+        return datetime.strptime(row[0][:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None  # header only
+
+def history_changed(path, header, df, last_date):
+    """True when the refetched bar of last_date no longer matches the stored close (split or dividend re-adjustment)."""
+    overlap = df[df["Date"] == last_date]
+    if overlap.empty or "Close" not in header:
+        return False
+    stored = float(last_stored_row(path)[header.index("Close")])
+    fetched = float(overlap["Close"].iloc[-1])
+    return abs(fetched - stored) > 1e-6 * max(abs(stored), 1.0)
+
+def read_header(path):
+    with open(path) as f:
+        return f.readline().strip().split(",")
 
-# === Clean Saved CSVs ===
-for symbol in stocks:
-    file_path = os.path.join(output_dir, f"{symbol}_daily_data.csv")
-    if not os.path.exists(file_path):
-        log(f"⚠️ File not found: {file_path}")
-        continue
+def normalize(df, header):
+    """Flatten yfinance's (Price, Ticker) columns and order them like the stored file."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df = df.reset_index(drop=True)
+    df["Date"] = pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d")
+    return df[[c for c in header if c in df.columns]]
 
+def atomic_write(path, df, append):
+    """Write (or append) rows through a temp file and rename it over the dataset."""
+    tmp_path = f"{path}.tmp"
+    if append:
+        shutil.copyfile(path, tmp_path)
+        with open(tmp_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+        with open(tmp_path, "a", newline="") as f:
+            if needs_newline:
+                f.write("\n")
+            df.to_csv(f, header=False, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+# === Download & Save ===
+def update_symbol(symbol, fetcher=yfinance_fetcher, full=False, end_date=None):
+    """Bring one symbol's CSV up to date and return the number of rows written."""
+    path = os.path.join(output_dir, f"{symbol}_daily_data.csv")
+    end_date = end_date or get_today()
+    last_date = None if full else last_stored_date(path)
+
+    if last_date:
+        next_date = (datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        if next_date >= end_date:
+            log(f"✔️ {symbol} already up to date ({last_date})", symbol=symbol)
+            return 0
+        # Refetch the last stored bar too: its close tells whether Yahoo re-adjusted the history
+        fetch_start = last_date
+        log(f"⬇️ Downloading {symbol} from {next_date} (last stored {last_date})...", symbol=symbol)
+    else:
+        fetch_start = start_date
+        log(f"⬇️ Downloading full history for {symbol}...", symbol=symbol)
+
+    started = time.perf_counter()
+    df = fetcher(symbol, fetch_start, end_date)
+    header = read_header(path) if last_date else columns
+    df = normalize(df, header)
+    if last_date:
+        if history_changed(path, header, df, last_date):
+            log(f"🔁 {symbol} history was re-adjusted (split or dividend), re-downloading it in full", symbol=symbol)
+            return update_symbol(symbol, fetcher, full=True, end_date=end_date)
+        df = df[df["Date"] > last_date]
+
+    if df.empty:
+        if last_date:
+            log(f"✔️ No new rows for {symbol}", symbol=symbol)
+            return 0
+        raise ValueError("No data returned")
+
+    appendable = bool(last_date) and columnar_store.is_current(symbol, path)
+    atomic_write(path, df, append=bool(last_date))
+    log(f"✅ Saved {len(df)} row(s) for {symbol} to {path}", symbol=symbol,
+        duration=time.perf_counter() - started, rows=len(df))
     try:
-        df = pd.read_csv(file_path)
-        if len(df) > 1:
-            df = df.iloc[1:].reset_index(drop=True)
-            df.to_csv(file_path, index=False)
-            log(f"🧹 Cleaned first row in: {file_path}")
-        else:
-            log(f"⚠️ Not enough rows to clean: {file_path}")
+        columnar_store.write_prices(symbol, path, df if appendable else None)
+        columnar_store.update_features(symbol)
     except Exception as e:
-        log(f"❌ Failed to clean {symbol}: {e}")
+        log(f"⚠️ Columnar store not updated for {symbol} (will rebuild from CSV): {e}", symbol=symbol)
+    return len(df)
+
+def download_all(symbols=None, fetcher=yfinance_fetcher, full=False, workers=download_workers):
+    """Update every symbol concurrently; returns {symbol: rows written or error message}."""
+    symbols = symbols or symbol_registry.symbols()
+    os.makedirs(output_dir, exist_ok=True)
+    log(f"🟢 Dataset download started ({'full' if full else 'incremental'}, {workers} workers)")
+    started = time.perf_counter()
+
+    def run(symbol):
+        try:
+            return update_symbol(symbol, fetcher, full)
+        except Exception as e:
+            log(f"❌ Failed to download {symbol}: {e}", symbol=symbol)
+            return f"error: {e}"
+
+    # Workers log under the caller's context (e.g. the pipeline stage)
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        summary = dict(zip(symbols, pool.map(lambda symbol: context.copy().run(run, symbol), symbols)))
+
+    log("✅ Dataset download completed\n", duration=time.perf_counter() - started)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download daily stock price datasets.")
+    parser.add_argument("--full", action="store_true", help="re-download the full history since 2000-01-01")
+    parser.add_argument("--workers", type=int, default=download_workers, help="concurrent downloads")
+    parser.add_argument("--source-dir", help="read bars from local CSVs instead of Yahoo Finance")
+    parser.add_argument("--no-accuracy", action="store_true", help="skip scoring saved predictions afterwards")
+    args = parser.parse_args(argv)
+
+    fetcher = LocalCsvFetcher(args.source_dir) if args.source_dir else yfinance_fetcher
+    summary = download_all(symbol_registry.symbols(), fetcher, args.full, args.workers)
+    if not args.no_accuracy:
+        from app.accuracy import update_accuracy
+        update_accuracy(log=log)
+    return summary
 
-log("✅ Dataset download completed\n")
+if __name__ == "__main__":
+    main()
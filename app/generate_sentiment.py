@@ -1,64 +1,39 @@
 import os
-import requests
 import pandas as pd
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import re
 from dotenv import load_dotenv
+from app.sentiment_engine import SentimentEngine
+from app.article_cache import ArticleScoreCache, score_with_cache
+from app.news_fetcher import NewsFetcher
+from app.columnar_store import columnar_store
+from app.metrics import record_job_metrics
+from app.job_log import get_logger
+from app.symbols import symbol_registry
+from app.shards import map_shards, PIPELINE_SHARDS
 
 load_dotenv(dotenv_path="/home/stock-api/.env.settings")
 
 # === Configuration Section ===
- 
+
 NEWS_API_KEY = os.getenv("API_KEY")
 
 def get_current_date():
     """Always return the current date to avoid caching issues"""
     return datetime.today().strftime('%Y-%m-%d')
 
-date_str = get_current_date()
+# Logging Helper
+log = get_logger("generate_sentiment")
 
-# Output directories
-sentiment_dir = os.path.join("sentiments/sentiment", date_str)
-chart_dir = os.path.join("sentiments/charts", date_str)
-summary_dir = os.path.join("sentiments/summary", date_str)
-log_dir = "logs"
-log_file = os.path.join(log_dir, f"{date_str}.log")
+# === FinBERT Engine (loaded on first use, reused across runs) ===
+sentiment_engine = SentimentEngine()
+_article_cache = None
 
-os.makedirs(sentiment_dir, exist_ok=True)
-os.makedirs(chart_dir, exist_ok=True)
-os.makedirs(summary_dir, exist_ok=True)
-os.makedirs(log_dir, exist_ok=True)
-
-# Logging Helper
-def log(message):
-    print(message)
-    with open(log_file, "a") as f:
-        f.write(f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
-
-log("🟢 Sentiment analysis job started")
-
-# === Stock Symbol => Query Mapping ===
-stock_queries = symbols = {
-    'AMZN':'Amazon',
-    'AAPL':'Apple',
-    'GOOGL':'Google',
-    '005930.KS':'Samsung',
-    '2317.TW':'Foxconn ',
-    'MSFT':'Microsoft',
-    'JD':'JD.com',
-    'BABA':'Alibaba',
-    'T':'AT&T',
-    'META':'Meta'
-}
-
-# === Load FinBERT Model ===
-log("🔄 Loading FinBERT model...")
-tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
-sentiment_pipeline = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
-log("✅ FinBERT model loaded")
+def get_article_cache():
+    global _article_cache
+    if _article_cache is None:
+        _article_cache = ArticleScoreCache(namespace=f"{sentiment_engine.model_name}:{sentiment_engine.backend}")
+    return _article_cache
 
 # === Helper Function to Clean Text ===
 def clean_text(text):
@@ -66,117 +41,224 @@ def clean_text(text):
         return ""
     return re.sub(r'\s+', ' ', text).strip()
 
-# === Fetch News & Analyze Sentiment ===
-for symbol, query in stock_queries.items():
-    log(f"\n🔍 Fetching news for {symbol}...")
-    all_articles = []
+def output_dirs(date_str):
+    """Return (sentiment_dir, chart_dir, summary_dir) for a date, creating them."""
+    dirs = tuple(os.path.join(base, date_str) for base in
+                 ("sentiments/sentiment", "sentiments/charts", "sentiments/summary"))
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+    return dirs
 
-    for i in range(7):
-        day = datetime.today() - timedelta(days=i)
-        day_str = day.strftime('%Y-%m-%d')
-        url = (
-            f"https://newsapi.org/v2/everything?q={query}&from={day_str}&to={day_str} - {date_str}"
-            f"&sortBy=publishedAt&pageSize=14&apiKey={NEWS_API_KEY}&language=en"
-        )
+# === Fetch News ===
+def fetch_news(date_str=None, symbols=None):
+    """Fetch the last 7 days of articles per symbol (all tracked symbols by default); returns {symbol: [article, ...]}."""
+    date_str = date_str or get_current_date()
+    stock_queries = symbol_registry.queries()
+    if symbols is not None:
+        stock_queries = {s: stock_queries[s] for s in symbols}
+    today = datetime.strptime(date_str, '%Y-%m-%d')
+    days = [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
 
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            articles = response.json().get("articles", [])
-        except Exception as e:
-            log(f"❌ Error fetching news for {symbol} on {day_str}: {e}")
-            continue
+    log(f"\n🔍 Fetching news for {len(stock_queries)} symbols x {len(days)} days...")
+    started = datetime.now()
+    news_fetcher = NewsFetcher(NEWS_API_KEY)
+    fetched = news_fetcher.fetch_all(stock_queries, days, today=date_str)
+    news_fetcher.close()
+    stats = news_fetcher.stats
+    log(f"🌐 News fetch: {stats['requests']} requests, "
+        f"{stats['cache_hits']} cached days, {stats['errors']} errors",
+        duration=(datetime.now() - started).total_seconds())
+    # Telemetry only: a failed metrics write must not cost the fetched articles
+    try:
+        record_job_metrics("news_fetch", {
+            "requests": stats["requests"],
+            "cache_hits": stats["cache_hits"],
+            "errors": stats["errors"],
+            "mean_latency_seconds": stats["latency_seconds_total"] / stats["requests"] if stats["requests"] else 0.0,
+            "max_latency_seconds": stats["latency_seconds_max"],
+        })
+    except Exception as e:
+        log(f"⚠️ News fetch job metrics not recorded: {e}")
+
+    articles_by_symbol = {}
 
-        for article in articles:
-            if not article.get("publishedAt"):
+    for symbol in stock_queries:
+        all_articles = []
+
+        for day_str in days:
+            articles = fetched[symbol][day_str]
+            if isinstance(articles, Exception):
+                log(f"❌ Error fetching news for {symbol} on {day_str}: {articles}", symbol=symbol)
                 continue
-            title = clean_text(article.get("title", ""))
-            description = clean_text(article.get("description", ""))
-            if title:
-                all_articles.append({
-                    "date": article["publishedAt"][:10],
-                    "title": title,
-                    "description": description
-                })
-
-    if not all_articles:
-        log(f"⚠️ No valid news articles found for {symbol}.")
-        continue
-
-    texts = [f"{a['title']}. {a['description']}" for a in all_articles]
+
+            for article in articles:
+                if not article.get("publishedAt"):
+                    continue
+                title = clean_text(article.get("title", ""))
+                description = clean_text(article.get("description", ""))
+                if title:
+                    all_articles.append({
+                        "date": article["publishedAt"][:10],
+                        "title": title,
+                        "description": description
+                    })
+
+        if not all_articles:
+            log(f"⚠️ No valid news articles found for {symbol}.", symbol=symbol)
+            continue
+
+        articles_by_symbol[symbol] = all_articles
+
+    return articles_by_symbol
+
+# === Analyze Sentiment (one batch queue across all symbols) ===
+def score_sentiment(articles_by_symbol, date_str=None):
+    """Score fetched articles and save per-symbol CSVs; returns (symbols written, scoring stats or None).
+
+    The stats are left to the caller to record, so shards running this in
+    separate processes report one combined set of job metrics.
+    """
+    date_str = date_str or get_current_date()
+    sentiment_dir, _, _ = output_dirs(date_str)
+
+    texts = [
+        f"{a['title']}. {a['description']}"
+        for all_articles in articles_by_symbol.values()
+        for a in all_articles
+    ]
+    if not texts:
+        return [], None
+
+    log(f"🧠 Scoring {len(texts)} articles with FinBERT ({sentiment_engine.backend}, batch size {sentiment_engine.batch_size})...")
     try:
-        results = sentiment_pipeline(texts)
+        started = datetime.now()
+        results, cache_stats = score_with_cache(texts, sentiment_engine, get_article_cache())
+        elapsed = (datetime.now() - started).total_seconds()
+        hit_rate = cache_stats["hits"] / cache_stats["total"] * 100
+        log(f"🗃️ Article cache: {cache_stats['hits']}/{cache_stats['total']} hits ({hit_rate:.1f}%), "
+            f"{cache_stats['scored']} unique articles sent to FinBERT")
+        log(f"✅ Scored {len(texts)} articles in {elapsed:.1f}s ({cache_stats['scored'] / max(elapsed, 1e-9):.1f} articles/sec)",
+            duration=elapsed, articles=len(texts))
     except Exception as e:
-        log(f"❌ Sentiment analysis failed for {symbol}: {e}")
-        continue
+        log(f"❌ Sentiment analysis failed: {e}")
+        return [], None
+    stats = {**cache_stats, "seconds": elapsed}
+
+    written = []
+    offset = 0
+    for symbol, all_articles in articles_by_symbol.items():
+        symbol_results = results[offset:offset + len(all_articles)]
+        offset += len(all_articles)
+
+        df = pd.DataFrame(all_articles)
+        df["sentiment"] = [r["label"].lower() for r in symbol_results]
+        df["confidence"] = [r["score"] for r in symbol_results]
 
-    df = pd.DataFrame(all_articles)
-    df["sentiment"] = [r["label"].lower() for r in results]
-    df["confidence"] = [r["score"] for r in results]
+        csv_path = os.path.join(sentiment_dir, f"{symbol}_sentiment.csv")
+        df.to_csv(csv_path, index=False)
+        log(f"✅ Saved sentiment CSV: {csv_path}", symbol=symbol)
+        written.append(symbol)
+        try:
+            columnar_store.write_sentiment_day(symbol, date_str, csv_path)
+            columnar_store.update_features(symbol)
+        except Exception as e:
+            log(f"⚠️ Columnar store not updated for {symbol} (will rebuild from CSV): {e}", symbol=symbol)
 
-    csv_path = os.path.join(sentiment_dir, f"{symbol}_sentiment.csv")
-    df.to_csv(csv_path, index=False)
-    log(f"✅ Saved sentiment CSV: {csv_path}")
+    return written, stats
 
-    # Chart
+def record_sentiment_metrics(stats):
+    """Record the combined scoring stats of one or more score_sentiment calls (shards run concurrently)."""
+    stats = [s for s in stats if s]
+    if not stats:
+        return
+    total = sum(s["total"] for s in stats)
+    scored = sum(s["scored"] for s in stats)
+    elapsed = max(s["seconds"] for s in stats)
+    # Telemetry only: a failed metrics write must not cost the scored articles
     try:
-        plt.figure(figsize=(6, 4))
-        df["sentiment"].value_counts().plot(kind='bar', color=["green", "red", "gray"])
-        plt.title(f"Sentiment for {symbol} News (Last 7 Days, 14/Day) - {date_str}")
-        plt.xlabel("Sentiment")
-        plt.ylabel("Number of Articles")
-        plt.xticks(rotation=0)
-        plt.tight_layout()
-        chart_path = os.path.join(chart_dir, f"{symbol}_chart.png")
-        plt.savefig(chart_path)
-        plt.close()
-        log(f"📊 Saved chart: {chart_path}")
+        record_job_metrics("sentiment", {
+            "articles": total,
+            "articles_scored": scored,
+            "cache_hit_ratio": sum(s["hits"] for s in stats) / total,
+            "score_seconds": elapsed,
+            "articles_per_second": scored / max(elapsed, 1e-9),
+        })
     except Exception as e:
-        log(f"❌ Failed to generate chart for {symbol}: {e}")
+        log(f"⚠️ Sentiment job metrics not recorded: {e}")
 
 # === Final Summary Output ===
-all_summaries = []
-
-for symbol in stock_queries:
-    csv_file = os.path.join(sentiment_dir, f"{symbol}_sentiment.csv")
-    if not os.path.exists(csv_file):
-        log(f"⚠️ Missing sentiment file for {symbol}, skipping summary")
-        continue
-
-    df = pd.read_csv(csv_file)
-    if df.empty:
-        log(f"⚠️ Empty sentiment file for {symbol}")
-        continue
-
-    sentiment_counts = df["sentiment"].value_counts().to_dict()
-    avg_confidence = df.groupby("sentiment")["confidence"].mean().to_dict()
-
-    summary_data = {
-        "date_collected": get_current_date(),
-        "symbol": symbol,
-        "total_articles": len(df),
-        "positive_count": sentiment_counts.get("positive", 0),
-        "neutral_count": sentiment_counts.get("neutral", 0),
-        "negative_count": sentiment_counts.get("negative", 0),
-        "avg_confidence_positive": round(avg_confidence.get("positive", 0), 4),
-        "avg_confidence_neutral": round(avg_confidence.get("neutral", 0), 4),
-        "avg_confidence_negative": round(avg_confidence.get("negative", 0), 4),
-    }
-
-    summary_df = pd.DataFrame([summary_data])
-    summary_path = os.path.join(summary_dir, f"{symbol}_summary.csv")
-    summary_df.to_csv(summary_path, index=False)
-    log(f"📁 Saved summary for {symbol}: {summary_path}")
-    all_summaries.append(summary_data)
-
-# === Save combined summary ===
-if all_summaries:
-    combined_df = pd.DataFrame(all_summaries)
-    combined_path = os.path.join(summary_dir, "all_symbols_summary.csv")
-    combined_df.to_csv(combined_path, index=False)
-    log(f"\n📊 Combined summary saved to: {combined_path}")
-else:
-    log("⚠️ No data available to write combined summary.")
-
-# === Final Log Message ===
-log(f"\n✅ Sentiment analysis completed for all stocks on {get_current_date()}")
+def write_summaries(date_str=None):
+    """Summarize each symbol's sentiment CSV and write the combined summary."""
+    date_str = date_str or get_current_date()
+    sentiment_dir, _, summary_dir = output_dirs(date_str)
+    all_summaries = []
+
+    for symbol in symbol_registry.symbols():
+        csv_file = os.path.join(sentiment_dir, f"{symbol}_sentiment.csv")
+        if not os.path.exists(csv_file):
+            log(f"⚠️ Missing sentiment file for {symbol}, skipping summary", symbol=symbol)
+            continue
+
+        df = pd.read_csv(csv_file)
+        if df.empty:
+            log(f"⚠️ Empty sentiment file for {symbol}", symbol=symbol)
+            continue
+
+        sentiment_counts = df["sentiment"].value_counts().to_dict()
+        avg_confidence = df.groupby("sentiment")["confidence"].mean().to_dict()
+
+        summary_data = {
+            "date_collected": date_str,
+            "symbol": symbol,
+            "total_articles": len(df),
+            "positive_count": sentiment_counts.get("positive", 0),
+            "neutral_count": sentiment_counts.get("neutral", 0),
+            "negative_count": sentiment_counts.get("negative", 0),
+            "avg_confidence_positive": round(avg_confidence.get("positive", 0), 4),
+            "avg_confidence_neutral": round(avg_confidence.get("neutral", 0), 4),
+            "avg_confidence_negative": round(avg_confidence.get("negative", 0), 4),
+        }
+
+        summary_df = pd.DataFrame([summary_data])
+        summary_path = os.path.join(summary_dir, f"{symbol}_summary.csv")
+        summary_df.to_csv(summary_path, index=False)
+        log(f"📁 Saved summary for {symbol}: {summary_path}", symbol=symbol)
+        all_summaries.append(summary_data)
+
+    # === Save combined summary ===
+    if all_summaries:
+        combined_df = pd.DataFrame(all_summaries)
+        combined_path = os.path.join(summary_dir, "all_symbols_summary.csv")
+        combined_df.to_csv(combined_path, index=False)
+        log(f"\n📊 Combined summary saved to: {combined_path}")
+    else:
+        log("⚠️ No data available to write combined summary.")
+
+    return all_summaries
+
+def analyze_sentiment(articles_by_symbol, date_str=None, shards=PIPELINE_SHARDS):
+    """Score articles (split by symbol across shards worker processes) and write summaries (the stage after fetch_news)."""
+    date_str = date_str or get_current_date()
+    stats = []
+    for part, result in map_shards(score_sentiment, articles_by_symbol, date_str, shards=shards):
+        if isinstance(result, Exception):
+            log(f"❌ Sentiment shard failed for {', '.join(part)}: {result}")
+        else:
+            stats.append(result[1])
+    record_sentiment_metrics(stats)
+    summaries = write_summaries(date_str)
+    log(f"\n✅ Sentiment analysis completed for all stocks on {date_str}")
+    return summaries
+
+def main():
+    from app.sentiment_charts import render_charts, SENTIMENT_CHARTS
+
+    date_str = get_current_date()
+    log("🟢 Sentiment analysis job started")
+    summaries = analyze_sentiment(fetch_news(date_str), date_str)
+    if SENTIMENT_CHARTS == "eager":
+        render_charts(date_str, log=log)
+    return summaries
+
+if __name__ == "__main__":
+    main()
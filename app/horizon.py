@@ -0,0 +1,127 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# === Configuration ===
+HORIZON_MAX_STEPS = int(os.getenv("HORIZON_MAX_STEPS", "30"))
+HORIZON_CACHE_MAX_ENTRIES = int(os.getenv("HORIZON_CACHE_MAX_ENTRIES", "256"))
+
+
+class RingWindow:
+    """Fixed-length sliding window over a preallocated buffer.
+
+    Every value is written twice (at i and i + size), so the current window
+    is always the contiguous slice buf[head:head + size] and pushing a value
+    never shifts or re-concatenates the array.
+    """
+
+    def __init__(self, values):
+        self.size = len(values)
+        self.buf = np.empty(2 * self.size, dtype=np.float64)
+        self.buf[:self.size] = values
+        self.buf[self.size:] = values
+        self.head = 0
+
+    def window(self):
+        return self.buf[self.head:self.head + self.size]
+
+    def push(self, value):
+        """Drop the oldest value and append value."""
+        self.buf[self.head] = value
+        self.buf[self.head + self.size] = value
+        self.head = (self.head + 1) % self.size
+
+
+class HorizonForecaster:
+    """Rolls the LSTM forward N business days by feeding predictions back in.
+
+    All requested symbols advance together, one step at a time, in the calling
+    thread (the API already runs it in an inference slot); forecasts are cached
+    per (symbol, steps, time_steps, model file version, dataset version), so
+    they are reused until the next data refresh or model update.
+    """
+
+    def __init__(self, max_entries=HORIZON_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._forecasts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def forecast(self, symbols, steps, time_steps=60):
+        """Return {"results": {symbol: [{"date", "predicted_price"}, ...]}, "errors": {symbol: message}}."""
+        from app.lstm_runtime import load_lstm
+        from app.model_cache import model_path
+        from app.price_store import price_store
+
+        if not 1 <= steps <= HORIZON_MAX_STEPS:
+            raise ValueError(f"steps must be between 1 and {HORIZON_MAX_STEPS}")
+        if time_steps < 1:
+            raise ValueError("days must be positive")
+
+        results, errors, pending = {}, {}, {}
+        for symbol in dict.fromkeys(symbols):
+            path = model_path("lstm", symbol)
+            try:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Model file not found: {path}")
+                st = os.stat(path)
+                series = price_store.get(symbol)
+                if len(series) < time_steps:
+                    raise ValueError("Not enough data")
+            except Exception as e:
+                errors[symbol] = str(e)
+                continue
+
+            key = (symbol, steps, time_steps, st.st_mtime_ns, st.st_size, series.mtime)
+            with self._lock:
+                cached = self._forecasts.get(key)
+                if cached is not None:
+                    self._forecasts.move_to_end(key)
+                    results[symbol] = cached
+                    continue
+            try:
+                model = load_lstm(path, time_steps=time_steps)
+            except Exception as e:
+                errors[symbol] = str(e)
+                continue
+            pending[symbol] = (key, model, series, RingWindow(series.scaled_tail(time_steps)))
+
+        if pending:
+            for symbol, forecast in self._roll(pending, steps).items():
+                key, _, series, _ = pending[symbol]
+                if isinstance(forecast, Exception):
+                    errors[symbol] = str(forecast)
+                    continue
+                dates = np.busday_offset(series.dates[-1], np.arange(1, steps + 1), roll="forward")
+                results[symbol] = [
+                    {"date": str(date), "predicted_price": round(float(price), 2)}
+                    for date, price in zip(dates, series.inverse(forecast))
+                ]
+                with self._lock:
+                    self._forecasts[key] = results[symbol]
+                    while len(self._forecasts) > self.max_entries:
+                        self._forecasts.popitem(last=False)
+
+        return {"results": {s: results[s] for s in symbols if s in results}, "errors": errors}
+
+    def _roll(self, pending, steps):
+        """Advance every symbol one step per iteration; returns {symbol: scaled predictions or Exception}."""
+        scaled = {symbol: np.empty(steps) for symbol in pending}
+        failed = {}
+        for step in range(steps):
+            for symbol, (_, model, _, ring) in pending.items():
+                if symbol in failed:
+                    continue
+                try:
+                    window = ring.window().reshape(1, ring.size, 1)
+                    value = float(np.asarray(model(window, training=False)).reshape(-1)[0])
+                except Exception as e:
+                    failed[symbol] = e
+                    continue
+                ring.push(value)
+                scaled[symbol][step] = value
+        return {symbol: failed.get(symbol, scaled[symbol]) for symbol in pending}
+
+
+horizon_forecaster = HorizonForecaster()
@@ -0,0 +1,153 @@
+import os
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, time, timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.responses import FileResponse, Response
+
+try:
+    import brotli  # optional: enables Content-Encoding: br
+except ImportError:
+    brotli = None
+
+# === Configuration ===
+ROLLOVER_UTC = time(2, 45)  # daily artifacts change at the same cutoff as get_today()
+COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "500"))
+ETAG_CACHE_MAX_FILES = 1024
+
+# Paths whose responses only change with the daily artifacts
+DAILY_PREFIXES = ("/sentiment_summary/", "/sentiment_chart/", "/metrics/", "/predict/", "/predictions/", "/backtest/", "/accuracy/")
+
+
+def seconds_until_rollover(now=None):
+    """Seconds until the next 02:45 UTC rollover."""
+    now = now or datetime.now(timezone.utc)
+    rollover = datetime.combine(now.date(), ROLLOVER_UTC, tzinfo=timezone.utc)
+    if now >= rollover:
+        rollover += timedelta(days=1)
+    return max(1, int((rollover - now).total_seconds()))
+
+
+def cache_control(path):
+    """Cache-Control value for a request path."""
+    if path.startswith(DAILY_PREFIXES):
+        return f"public, max-age={seconds_until_rollover()}"
+    return "no-cache"
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+class FileETags:
+    """Content-hash ETags, computed once per (path, mtime, size) file version."""
+
+    def __init__(self, max_files=ETAG_CACHE_MAX_FILES):
+        self.max_files = max_files
+        self._etags = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, st):
+        version = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._etags.get(path)
+            if cached and cached[0] == version:
+                self._etags.move_to_end(path)
+                return cached[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()}"'
+
+        with self._lock:
+            self._etags[path] = (version, etag)
+            self._etags.move_to_end(path)
+            while len(self._etags) > self.max_files:
+                self._etags.popitem(last=False)
+        return etag
+
+
+file_etags = FileETags()
+
+
+def file_response(request, path, media_type):
+    """FileResponse with a content ETag, Last-Modified and 304 on a conditional hit.
+
+    Returns None when the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    headers = {
+        "ETag": file_etags.get(path, st),
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": cache_control(request.url.path),
+    }
+    if not_modified(request, headers["ETag"], st.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+
+
+def not_modified(request, etag, mtime=None):
+    """True when the request's validators show the client already has this version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        return etag_matches(if_none_match, etag)
+    if mtime is not None and request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def compress(body, accept_encoding):
+    """Return (encoded body, encoding) using br or gzip when the client accepts it."""
+    accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body, quality=5), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
+
+
+async def json_cache_middleware(request, call_next):
+    """Add ETag/Cache-Control to GET JSON responses, answer 304s and compress bodies."""
+    response = await call_next(request)
+    if (request.method not in ("GET", "HEAD") or response.status_code != 200
+            or not response.headers.get("content-type", "").startswith("application/json")):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = dict(response.headers)
+    headers.pop("content-length", None)
+    # Weak: the same JSON may be sent gzip, br or identity encoded
+    headers["etag"] = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers.setdefault("cache-control", cache_control(request.url.path))
+    vary = [v.strip() for v in headers.get("vary", "").split(",") if v.strip()]
+    headers["vary"] = ", ".join(vary + ["Accept-Encoding"])
+
+    if not_modified(request, headers["etag"]):
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        body, encoding = compress(body, request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["content-encoding"] = encoding
+    return Response(content=body, status_code=200, headers=headers)
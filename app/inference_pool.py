@@ -0,0 +1,109 @@
+import os
+import math
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# === Configuration ===
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "16"))
+
+
+class InferenceQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is at its limit."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferencePool:
+    """Bounded thread pool that keeps model inference off the API event loop.
+
+    At most `workers` calls run at once and at most `queue_depth` more may
+    wait; anything beyond that is rejected immediately instead of queueing,
+    with a retry hint based on recent call times. run_shared() additionally
+    lets identical concurrent calls share one execution.
+    """
+
+    def __init__(self, workers=INFERENCE_WORKERS, queue_depth=INFERENCE_QUEUE_DEPTH):
+        self.workers = max(1, workers)
+        self.queue_depth = max(0, queue_depth)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+        self._in_flight = 0
+        self._avg_seconds = 0.0
+        self._counts = {"executed": 0, "coalesced": 0, "rejected": 0}
+        self._shared = {}  # key -> future of the execution in flight (event loop only)
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the pool and await its result."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counts["rejected"] += 1
+            raise InferenceQueueFull("Inference queue is full, retry later", self.retry_after())
+        with self._lock:
+            self._in_flight += 1
+            self._counts["executed"] += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._in_flight -= 1
+                # Moving average of call time (queue wait included), for Retry-After
+                self._avg_seconds = elapsed if not self._avg_seconds else 0.8 * self._avg_seconds + 0.2 * elapsed
+            self._slots.release()
+
+    async def run_shared(self, key, func, *args):
+        """Like run(), but calls with an equal key made while one is in flight share its result (or error).
+
+        The key must identify everything the result depends on (endpoint,
+        arguments, data version). A caller that goes away does not cancel
+        the execution the others are waiting for.
+        """
+        future = self._shared.get(key)
+        if future is not None:
+            with self._lock:
+                self._counts["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self.run(func, *args))
+        self._shared[key] = future
+        future.add_done_callback(functools.partial(self._release_shared, key))
+        return await asyncio.shield(future)
+
+    def _release_shared(self, key, future):
+        if self._shared.get(key) is future:
+            del self._shared[key]
+        if not future.cancelled():
+            future.exception()  # retrieved here, so an error nobody awaited is not logged as lost
+
+    def retry_after(self):
+        """Seconds until a slot is likely free: the time to drain a full queue at the recent call time."""
+        with self._lock:
+            avg = self._avg_seconds
+        return min(60, max(1, math.ceil(avg * (self.workers + self.queue_depth) / self.workers)))
+
+    def stats(self):
+        with self._lock:
+            in_flight = self._in_flight
+            counts = dict(self._counts)
+            avg = self._avg_seconds
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+            "shared_in_flight": len(self._shared),
+            **counts,
+            "avg_call_seconds": round(avg, 4),
+        }
+
+
+inference_pool = InferencePool()
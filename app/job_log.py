@@ -0,0 +1,190 @@
+import os
+import csv
+import json
+import queue
+import atexit
+import threading
+import contextvars
+from datetime import datetime
+
+# === Configuration ===
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() in ("1", "true", "yes")
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "512"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Set by the pipeline while a stage runs, so every job message carries its stage
+current_stage = contextvars.ContextVar("current_stage", default=None)
+
+LEVELS = {"❌": "error", "⚠️": "warning"}
+
+
+class LogWriter:
+    """Writes log records from one background thread.
+
+    Callers only enqueue. The writer takes whatever is queued (up to
+    batch_size records), appends it through file handles it keeps open and
+    flushes each touched file once per batch. Daily files are named by the
+    record's date, so they rotate at midnight; handles of finished days are
+    closed. A full queue drops records (counted in stats) rather than
+    blocking the job.
+    """
+
+    def __init__(self, log_dir=LOG_DIR, json_lines=LOG_JSON, batch_size=LOG_BATCH_SIZE, queue_size=LOG_QUEUE_SIZE):
+        self.log_dir = log_dir
+        self.json_lines = json_lines
+        self.batch_size = max(1, batch_size)
+        self.queue_size = queue_size
+        self.stats = {"records": 0, "batches": 0, "dropped": 0}
+        self._queue = None
+        self._pid = None
+        self._files = {}  # path -> (handle, day or None)
+        self._lock = threading.Lock()
+
+    def log(self, message, fields, when=None):
+        """Queue a `[HH:MM:SS] message` line for logs/{date}.log and a JSON line for logs/{date}.jsonl."""
+        self._submit(("log", when or datetime.now(), message, fields))
+
+    def append_csv(self, path, header, row):
+        """Queue a CSV row; header is written first when the file is new or empty."""
+        self._submit(("csv", path, tuple(header), list(row)))
+
+    def flush(self):
+        """Block until every record queued by this process is on disk."""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            for handle, _ in self._files.values():
+                handle.close()
+            self._files.clear()
+
+    def _submit(self, item):
+        try:
+            self._ensure_started().put_nowait(item)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _ensure_started(self):
+        # Per process: a forked child would otherwise share the parent's (dead) thread
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(self.queue_size)
+                    self._files = {}
+                    threading.Thread(target=self._run, args=(self._queue,), name="log-writer", daemon=True).start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def _run(self, q):
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock:
+                    self._write(batch)
+            except Exception as e:
+                print(f"⚠️ Log writer failed to write {len(batch)} record(s): {e}")
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def _write(self, batch):
+        touched, days = set(), set()
+        for item in batch:
+            if item[0] == "log":
+                _, when, message, fields = item
+                day = when.strftime("%Y-%m-%d")
+                days.add(day)
+                text = self._handle(os.path.join(self.log_dir, f"{day}.log"), day)
+                text.write(f"[{when.strftime('%H:%M:%S')}] {message}\n")
+                touched.add(text)
+                if self.json_lines:
+                    record = {"ts": when.isoformat(timespec="milliseconds"), **fields, "message": message}
+                    lines = self._handle(os.path.join(self.log_dir, f"{day}.jsonl"), day)
+                    lines.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    touched.add(lines)
+            else:
+                _, path, header, row = item
+                handle = self._handle(path, header=header)
+                csv.writer(handle).writerow(row)
+                touched.add(handle)
+
+        for handle in touched:
+            handle.flush()
+        self.stats["records"] += len(batch)
+        self.stats["batches"] += 1
+
+        # Daily rotation: the previous day's files are done once a newer day is written
+        if days:
+            latest = max(days)
+            for path, (handle, day) in list(self._files.items()):
+                if day is not None and day < latest:
+                    handle.close()
+                    del self._files[path]
+
+    def _handle(self, path, day=None, header=None):
+        entry = self._files.get(path)
+        if entry is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            handle = open(path, "a", newline="", encoding="utf-8")
+            if header and handle.tell() == 0:
+                csv.writer(handle).writerow(header)
+            entry = self._files[path] = (handle, day)
+        return entry[0]
+
+
+log_writer = LogWriter()
+atexit.register(log_writer.close)
+
+
+class JobLogger:
+    """Callable logger for a job: log(message, symbol=..., duration=..., **fields).
+
+    Prints the message (as the jobs always did) and queues it for the daily
+    text log plus a structured JSON line carrying job, stage, level and any
+    fields; duration is recorded in seconds as duration_seconds.
+    """
+
+    def __init__(self, job, writer=log_writer, echo=True, **fields):
+        self.job = job
+        self.writer = writer
+        self.echo = echo
+        self.fields = fields
+
+    def __call__(self, message, level=None, duration=None, **fields):
+        if self.echo:
+            print(message)
+        if level is None:
+            level = next((lvl for prefix, lvl in LEVELS.items() if message.lstrip().startswith(prefix)), "info")
+        record = {"job": self.job, "level": level}
+        stage = current_stage.get()
+        if stage:
+            record["stage"] = stage
+        record.update(self.fields)
+        record.update((k, v) for k, v in fields.items() if v is not None)
+        if duration is not None:
+            record["duration_seconds"] = round(float(duration), 4)
+        self.writer.log(message, record)
+
+    def bind(self, **fields):
+        """A logger that adds fields to every record."""
+        return JobLogger(self.job, self.writer, self.echo, **{**self.fields, **fields})
+
+
+def get_logger(job, **fields):
+    return JobLogger(job, **fields)
+
+
+def append_csv(path, header, row):
+    log_writer.append_csv(path, header, row)
+
+
+def flush():
+    log_writer.flush()
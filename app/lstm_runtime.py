@@ -0,0 +1,210 @@
+import os
+import glob
+import argparse
+import threading
+
+import numpy as np
+
+# === Configuration ===
+# keras:  load the .h5 models with TensorFlow/Keras
+# tflite: run TFLite exports (python -m app.lstm_runtime export) with the LiteRT interpreter;
+#         models without an up-to-date export fall back to Keras
+LSTM_BACKEND = os.getenv("LSTM_BACKEND", "keras")
+LSTM_BACKENDS = ("keras", "tflite")
+TFLITE_DIR = os.getenv("LSTM_TFLITE_DIR", "cache/tflite")
+TFLITE_THREADS = int(os.getenv("LSTM_TFLITE_THREADS", "1"))
+PARITY_TOLERANCE = float(os.getenv("LSTM_PARITY_TOLERANCE", "1e-4"))
+DEFAULT_TIME_STEPS = 60
+
+_fallback_warned = set()
+
+
+def tflite_path(h5_path):
+    """cache/tflite/{family}/{symbol}.tflite for models/{family}/{symbol}_best_model.h5."""
+    family = os.path.basename(os.path.dirname(h5_path))
+    symbol = os.path.basename(h5_path)[:-len("_best_model.h5")]
+    return os.path.join(TFLITE_DIR, family, f"{symbol}.tflite")
+
+
+def is_fresh(h5_path, export_path):
+    """True when the export exists and is not older than the Keras model it was built from."""
+    return os.path.exists(export_path) and os.path.getmtime(export_path) >= os.path.getmtime(h5_path)
+
+
+def resolve(h5_path, backend=None):
+    """Return the file to serve h5_path from under the backend (the .h5 itself or its TFLite export)."""
+    backend = backend or LSTM_BACKEND
+    if backend not in LSTM_BACKENDS:
+        raise ValueError(f"Unknown LSTM backend: {backend} (expected one of {', '.join(LSTM_BACKENDS)})")
+    if backend == "tflite":
+        export_path = tflite_path(h5_path)
+        if is_fresh(h5_path, export_path):
+            return export_path
+        if h5_path not in _fallback_warned:
+            _fallback_warned.add(h5_path)
+            print(f"⚠️ No up-to-date TFLite export for {h5_path}; serving it with Keras")
+    return h5_path
+
+
+def load_lstm(h5_path, backend=None, time_steps=None):
+    """Return the cached predictor for an LSTM model file under the configured backend.
+
+    TFLite exports have a fixed window length; other time_steps are served by Keras.
+    """
+    from app.model_cache import model_cache
+
+    if not os.path.exists(h5_path):
+        raise FileNotFoundError(f"Model file not found: {h5_path}")
+    model = model_cache.get(resolve(h5_path, backend))
+    if time_steps is not None and isinstance(model, TFLiteModel) and model.input_shape[1] != time_steps:
+        return model_cache.get(h5_path)
+    return model
+
+
+def _interpreter_class():
+    # Prefer the standalone runtimes, so serving does not need to import TensorFlow
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """A TFLite LSTM export behind the subset of the Keras model API the predictors use.
+
+    The graph is converted for a single window, so a batch is run one row at
+    a time. One interpreter is not safe to share between threads; calls on
+    the same model are serialised by a lock.
+    """
+
+    def __init__(self, path, num_threads=TFLITE_THREADS):
+        with open(path, "rb") as f:
+            content = f.read()
+        self.path = path
+        self.nbytes = len(content)
+        self._interpreter = _interpreter_class()(model_content=content, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self.input_shape = (None,) + tuple(int(dim) for dim in self._input["shape"][1:])
+        self._lock = threading.Lock()
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.float32)
+        out = np.empty((len(x), int(self._output["shape"][-1])), dtype=np.float32)
+        with self._lock:
+            for i in range(len(x)):
+                self._interpreter.set_tensor(self._input["index"], x[i:i + 1])
+                self._interpreter.invoke()
+                out[i] = self._interpreter.get_tensor(self._output["index"])[0]
+        return out
+
+    def predict(self, x, verbose="auto"):
+        return self(x)
+
+
+# === Export ===
+def convert_to_tflite(model, time_steps=DEFAULT_TIME_STEPS):
+    """Convert a Keras LSTM to a TFLite flatbuffer for one input window (batch size 1).
+
+    A fixed input shape lets the converter lower the LSTM loop to builtin ops,
+    and tracing without the model object freezes the weights into constants,
+    so the result runs on the plain LiteRT interpreter without TF ops.
+    """
+    import tensorflow as tf
+
+    shape = [1] + [dim or time_steps for dim in model.input_shape[1:]]
+    forward = tf.function(lambda x: model(x, training=False))
+    concrete = forward.get_concrete_function(tf.TensorSpec(shape, tf.float32))
+    return tf.lite.TFLiteConverter.from_concrete_functions([concrete]).convert()
+
+
+def parity_error(keras_model, tflite_model, windows):
+    """Largest absolute difference between the Keras and TFLite outputs on windows."""
+    expected = np.asarray(keras_model(np.asarray(windows, dtype=np.float32), training=False))
+    return float(np.max(np.abs(expected - tflite_model(windows))))
+
+
+def parity_windows(input_shape, samples=32, seed=0):
+    """Deterministic inputs spanning the scaled [0, 1] range the models are fed (plus the extremes)."""
+    shape = [dim or DEFAULT_TIME_STEPS for dim in input_shape[1:]]
+    rng = np.random.default_rng(seed)
+    windows = rng.random([samples] + shape, dtype=np.float32)
+    windows[0], windows[1] = 0.0, 1.0
+    # Smooth, trending windows resemble real price histories more than noise does
+    windows[2:samples // 2] = np.sort(windows[2:samples // 2], axis=1)
+    return windows
+
+
+def export_tflite(h5_path, out_path=None, tolerance=PARITY_TOLERANCE, force=False):
+    """Export one .h5 model to TFLite; the file is only written if it matches Keras within tolerance.
+
+    Returns {"model", "path", "status", "max_abs_error", "bytes"}; status is
+    exported, skipped (export already up to date) or mismatch.
+    """
+    from app.model_cache import model_cache
+
+    out_path = out_path or tflite_path(h5_path)
+    if not force and is_fresh(h5_path, out_path):
+        return {"model": h5_path, "path": out_path, "status": "skipped"}
+
+    keras_model = model_cache.get(h5_path)
+    content = convert_to_tflite(keras_model)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    error = parity_error(keras_model, TFLiteModel(tmp_path), parity_windows(keras_model.input_shape))
+    result = {"model": h5_path, "path": out_path, "max_abs_error": error, "bytes": len(content)}
+    if error > tolerance:
+        os.remove(tmp_path)
+        return {**result, "status": "mismatch"}
+    os.replace(tmp_path, out_path)
+    return {**result, "status": "exported"}
+
+
+def export_all(families=None, symbols=None, tolerance=PARITY_TOLERANCE, force=False):
+    """Export every model of the given families (all by default), optionally limited to symbols."""
+    from app.model_cache import MODEL_DIRS
+
+    results = []
+    for family in families or MODEL_DIRS:
+        for path in sorted(glob.glob(os.path.join(MODEL_DIRS[family], "*_best_model.h5"))):
+            symbol = os.path.basename(path)[:-len("_best_model.h5")]
+            if symbols and symbol not in symbols:
+                continue
+            try:
+                result = export_tflite(path, tolerance=tolerance, force=force)
+            except Exception as e:
+                result = {"model": path, "status": "failed", "error": str(e)}
+            icon = {"exported": "✅", "skipped": "⏭️"}.get(result["status"], "❌")
+            detail = result.get("error") or (
+                f"max |keras - tflite| = {result['max_abs_error']:.2e}" if "max_abs_error" in result else "up to date")
+            print(f"{icon} {family}/{symbol}: {result['status']} ({detail})")
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TFLite exports of the LSTM models for LSTM_BACKEND=tflite.")
+    parser.add_argument("command", choices=["export"], help="export: convert the .h5 models and check parity with Keras")
+    parser.add_argument("--families", help="comma-separated model families (default: all)")
+    parser.add_argument("--symbols", help="comma-separated symbols (default: all)")
+    parser.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE)
+    parser.add_argument("--force", action="store_true", help="re-export models whose export is up to date")
+    args = parser.parse_args()
+
+    results = export_all(
+        families=args.families.split(",") if args.families else None,
+        symbols=set(args.symbols.split(",")) if args.symbols else None,
+        tolerance=args.tolerance,
+        force=args.force,
+    )
+    failed = [r for r in results if r["status"] in ("mismatch", "failed")]
+    if failed:
+        raise SystemExit(f"❌ {len(failed)} model(s) not exported")
@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import fcntl
+import bisect
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# === Configuration ===
+JOB_METRICS_FILE = os.getenv("JOB_METRICS_FILE", "cache/job_metrics.json")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value!r}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # per-bucket counts (+Inf last), then sum
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {counts[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Process-local metrics plus collectors that are only evaluated at scrape time.
+
+    Updating a metric is a dict update under a lock; anything that already
+    keeps its own counters (caches, pool, pipeline state files) is exported
+    by a collector instead, so it costs nothing outside of /metrics.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def collector(self, func):
+        """Register func() -> iterable of metrics (fresh Gauge/Counter objects) built at scrape time."""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                for metric in collect():
+                    lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+registry = Registry()
+
+# === Shared Metrics ===
+request_seconds = registry.histogram(
+    "stock_api_request_duration_seconds", "HTTP request latency per route", ("method", "route", "status"))
+model_load_seconds = registry.histogram(
+    "stock_api_model_load_seconds", "Keras model load time", ("family",))
+model_predict_seconds = registry.histogram(
+    "stock_api_model_predict_seconds", "Single forward pass time", ("family",))
+precomputed_lookups = registry.counter(
+    "stock_api_precomputed_lookups_total", "Prediction requests answered from results/ (hit) or run live (miss)",
+    ("model", "result"))
+
+
+# === Job Metrics (written by the pipeline process, read at scrape time) ===
+_job_lock = threading.Lock()
+
+
+def record_job_metrics(job, values, path=None):
+    """Merge {name: number} for a batch job into the job metrics file (earlier keys are kept).
+
+    The API, the scheduler and spawned pipeline workers all write this file, so
+    the read-modify-write runs under an flock on a side lock file and the new
+    content goes through a unique temp file.
+    """
+    path = path or JOB_METRICS_FILE
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with _job_lock, open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data[job] = {**data.get(job, {}), **values, "last_update_timestamp": time.time()}
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# === Scrape-time Collectors ===
+def _gauge(name, help_text, labels, samples):
+    gauge = Gauge(name, help_text, labels)
+    for labelvalues, value in samples:
+        if value is not None:
+            gauge.set(value, **dict(zip(labels, labelvalues)))
+    return gauge
+
+
+@registry.collector
+def cache_metrics():
+    from app.model_cache import model_cache
+    from app.snapshot_cache import snapshot_cache
+    from app.inference_pool import inference_pool
+
+    models = model_cache.stats()
+    snapshots = snapshot_cache.stats()
+    pool = inference_pool.stats()
+    lookups = Counter("stock_api_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+    for cache, stats in (("model", models), ("snapshot", snapshots)):
+        lookups.inc(stats["hits"], cache=cache, result="hit")
+        lookups.inc(stats["misses"], cache=cache, result="miss")
+    inference = Counter("stock_api_inference_calls_total",
+                        "Live inference calls: executed, coalesced into one in flight, or rejected (queue full)",
+                        ("result",))
+    for result in ("executed", "coalesced", "rejected"):
+        inference.inc(pool[result], result=result)
+    return [
+        lookups,
+        inference,
+        _gauge("stock_api_cached_models", "Keras models currently in memory", (), [((), models["cached_models"])]),
+        _gauge("stock_api_cached_model_megabytes", "Estimated memory of cached models", (), [((), models["cached_mb"])]),
+        _gauge("stock_api_inference_in_flight", "Live inference calls running or queued", (), [((), pool["in_flight"])]),
+    ]
+
+
+@registry.collector
+def startup_metrics():
+    from app.startup import startup
+
+    status = startup.status()
+    return [
+        _gauge("stock_api_ready", "1 once the startup warm-up has finished", (), [((), int(status["ready"]))]),
+        _gauge("stock_api_startup_phase_seconds", "Duration of each startup phase (import, warm-up, scheduler)",
+               ("phase",), [((phase,), seconds) for phase, seconds in sorted(status["phases"].items())]),
+    ]
+
+
+@registry.collector
+def pipeline_metrics():
+    from app.pipeline import STATE_FILE
+
+    state = read_json(STATE_FILE)
+    seconds, rss, last_success = [], [], []
+    for stage, entry in sorted(state.items()):
+        seconds.append(((stage,), entry.get("seconds")))
+        rss.append(((stage,), entry.get("peak_rss_mb")))
+        if entry.get("last_success"):
+            stamp = time.mktime(time.strptime(entry["last_success"], "%Y-%m-%d %H:%M:%S"))
+            last_success.append(((stage,), stamp))
+    return [
+        _gauge("stock_api_pipeline_stage_duration_seconds", "Wall time of the last successful run", ("stage",), seconds),
+        _gauge("stock_api_pipeline_stage_peak_rss_megabytes", "Peak RSS after the last successful run", ("stage",), rss),
+        _gauge("stock_api_pipeline_stage_last_success_timestamp_seconds", "Unix time of the last successful run",
+               ("stage",), last_success),
+    ]
+
+
+@registry.collector
+def job_metrics():
+    gauges = []
+    for job, values in sorted(read_json(JOB_METRICS_FILE).items()):
+        for name, value in sorted(values.items()):
+            if isinstance(value, (int, float)):
+                gauges.append(_gauge(f"stock_api_{job}_{name}", f"{job} job: {name} (last run)", (), [((), value)]))
+    return gauges
@@ -0,0 +1,170 @@
+import os
+import glob
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import model_load_seconds
+
+# === Configuration ===
+MODEL_DIRS = {
+    "lstm": "models/lstm",
+    "lstm_senti": "models/lstm_senti",
+}
+MAX_MODELS = int(os.getenv("MODEL_CACHE_MAX_MODELS", "20"))
+MAX_MB = float(os.getenv("MODEL_CACHE_MAX_MB", "0"))  # 0 = no memory budget
+
+
+def model_path(family: str, symbol: str) -> str:
+    """Return the .h5 path for a model family ("lstm" / "lstm_senti") and symbol (model_paths in the symbol registry win)."""
+    from app.symbols import symbol_registry, MODELS
+
+    model = next(name for name, f in MODELS.items() if f == family)
+    return symbol_registry.model_path(model, symbol)
+
+
+class ModelCache:
+    """Process-wide LRU cache of Keras models (and their TFLite exports), reloaded when the file's mtime changes."""
+
+    def __init__(self, max_models: int = MAX_MODELS, max_mb: float = MAX_MB):
+        self.max_models = max_models
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._models = OrderedDict()  # path -> {"mtime", "bytes", "model"}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "evictions": 0,
+            "load_seconds_total": 0.0,
+        }
+        self._load_times = {}
+
+    def get(self, path: str):
+        """Return the model stored at path, loading it on a miss or a changed file."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
+        mtime = os.path.getmtime(path)
+
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is not None and entry["mtime"] == mtime:
+                self._models.move_to_end(path)
+                self._stats["hits"] += 1
+                return entry["model"]
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+
+        # Load outside the cache lock so other models stay servable meanwhile
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(path)
+                if entry is not None and entry["mtime"] == mtime:
+                    self._models.move_to_end(path)
+                    self._stats["hits"] += 1
+                    return entry["model"]
+                self._stats["misses"] += 1
+                if entry is not None:
+                    self._stats["reloads"] += 1
+
+            start = time.perf_counter()
+            model = self._load(path)
+            elapsed = time.perf_counter() - start
+            model_load_seconds.observe(elapsed, family=os.path.basename(os.path.dirname(path)))
+
+            with self._lock:
+                self._models[path] = {
+                    "mtime": mtime,
+                    "bytes": self._estimate_bytes(model),
+                    "model": model,
+                }
+                self._models.move_to_end(path)
+                self._stats["load_seconds_total"] += elapsed
+                self._load_times[path] = round(elapsed, 4)
+                self._evict()
+            return model
+
+    def get_model(self, family: str, symbol: str):
+        """Return the cached model for a family and symbol."""
+        return self.get(model_path(family, symbol))
+
+    def warm_up(self, families=None, trace=False):
+        """Load every model file of the given families (all by default) into the cache.
+
+        With trace, each model also runs one prediction on zeros, so the first
+        real request does not pay for building its predict function.
+        """
+        from app.lstm_runtime import resolve
+
+        loaded = 0
+        for family in families or MODEL_DIRS:
+            for path in sorted(glob.glob(os.path.join(MODEL_DIRS[family], "*_best_model.h5"))):
+                if self.max_models and loaded >= self.max_models:
+                    return loaded
+                try:
+                    model = self.get(resolve(path))
+                    if trace:
+                        import numpy as np
+                        # Variable-length inputs are traced with the default 60-day window
+                        shape = [dim or 60 for dim in model.input_shape[1:]]
+                        model.predict(np.zeros([1] + shape), verbose=0)
+                    loaded += 1
+                except Exception as e:
+                    print(f"❌ Failed to warm up {path}: {e}")
+        return loaded
+
+    def clear(self):
+        """Drop every cached model."""
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters, load timings and the cached model list."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            loads = len(self._load_times)
+            return {
+                **self._stats,
+                "load_seconds_total": round(self._stats["load_seconds_total"], 4),
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "cached_models": len(self._models),
+                "cached_mb": round(sum(e["bytes"] for e in self._models.values()) / (1024 * 1024), 2),
+                "max_models": self.max_models,
+                "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "avg_load_seconds": round(self._stats["load_seconds_total"] / loads, 4) if loads else 0.0,
+                "last_load_seconds": dict(self._load_times),
+            }
+
+    def _evict(self):
+        """Drop least recently used models until the count and memory budgets hold."""
+        def over_budget():
+            if self.max_models and len(self._models) > self.max_models:
+                return True
+            if self.max_bytes and sum(e["bytes"] for e in self._models.values()) > self.max_bytes:
+                return True
+            return False
+
+        # Always keep the most recently used model, even if it alone exceeds the budget
+        while len(self._models) > 1 and over_budget():
+            self._models.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _load(path: str):
+        if path.endswith(".tflite"):
+            from app.lstm_runtime import TFLiteModel
+            return TFLiteModel(path)
+        from tensorflow.keras.models import load_model
+        return load_model(path, compile=False)
+
+    @staticmethod
+    def _estimate_bytes(model) -> int:
+        if hasattr(model, "nbytes"):
+            return model.nbytes
+        try:
+            return int(model.count_params()) * 4  # float32 weights
+        except Exception:
+            return 0
+
+
+model_cache = ModelCache()
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# === Configuration ===
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+NEWS_CACHE_DIR = os.getenv("NEWS_CACHE_DIR", "cache/news")
+NEWS_FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", "4"))
+NEWS_FETCH_TIMEOUT = float(os.getenv("NEWS_FETCH_TIMEOUT", "10"))
+NEWS_MAX_REQUESTS_PER_SEC = float(os.getenv("NEWS_MAX_REQUESTS_PER_SEC", "2"))
+NEWS_FETCH_RETRIES = int(os.getenv("NEWS_FETCH_RETRIES", "3"))
+PAGE_SIZE = 14
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class NewsFetcher:
+    """Fetches one day of NewsAPI articles per (query, day) over a pooled session.
+
+    Requests run on a bounded thread pool, spaced by a rate limiter, with
+    timeouts and retry/backoff on 429 and 5xx responses. Responses for days
+    that are already over (before `today`) are cached on disk and never
+    fetched again.
+    """
+
+    def __init__(self, api_key, base_url=NEWS_API_URL, cache_dir=NEWS_CACHE_DIR,
+                 workers=NEWS_FETCH_WORKERS, timeout=NEWS_FETCH_TIMEOUT,
+                 max_requests_per_sec=NEWS_MAX_REQUESTS_PER_SEC, retries=NEWS_FETCH_RETRIES):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.limiter = RateLimiter(max_requests_per_sec)
+        self.stats = {"requests": 0, "cache_hits": 0, "errors": 0,
+                      "latency_seconds_total": 0.0, "latency_seconds_max": 0.0}
+        self._stats_lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Sent as a header so the key never ends up in logged URLs
+        self.session.headers["X-Api-Key"] = api_key or ""
+
+    def fetch_day(self, query, day, today=None):
+        """Return the raw article dicts published on day for query."""
+        today = today or datetime.today().strftime("%Y-%m-%d")
+        closed = day < today
+        cache_path = self._cache_path(query, day)
+
+        if closed and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self._count("cache_hits")
+                return json.load(f)
+
+        self.limiter.wait()
+        self._count("requests")
+        started = time.perf_counter()
+        response = self.session.get(self.base_url, timeout=self.timeout, params={
+            "q": query,
+            "from": day,
+            "to": day,
+            "sortBy": "publishedAt",
+            "pageSize": PAGE_SIZE,
+            "language": "en",
+        })
+        self._record_latency(time.perf_counter() - started)
+        response.raise_for_status()
+        articles = response.json().get("articles", [])
+
+        if closed:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(articles, f)
+            os.replace(tmp_path, cache_path)
+        return articles
+
+    def fetch_all(self, queries, days, today=None):
+        """Fetch every (symbol, day) pair concurrently.
+
+        queries maps symbol -> search query. Returns {symbol: {day: articles or Exception}}.
+        """
+        jobs = [(symbol, query, day) for symbol, query in queries.items() for day in days]
+        results = {symbol: {} for symbol in queries}
+
+        def run(job):
+            symbol, query, day = job
+            try:
+                return self.fetch_day(query, day, today)
+            except Exception as e:
+                self._count("errors")
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for (symbol, _, day), outcome in zip(jobs, pool.map(run, jobs)):
+                results[symbol][day] = outcome
+        return results
+
+    def close(self):
+        self.session.close()
+
+    def _cache_path(self, query, day):
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, day, f"{digest}.json")
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _record_latency(self, seconds):
+        # Includes retries and Retry-After waits, i.e. what the pipeline actually waited
+        with self._stats_lock:
+            self.stats["latency_seconds_total"] += seconds
+            self.stats["latency_seconds_max"] = max(self.stats["latency_seconds_max"], seconds)
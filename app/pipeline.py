@@ -0,0 +1,236 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import resource
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from app.job_log import get_logger, current_stage, flush as flush_logs
+
+STATE_FILE = os.getenv("PIPELINE_STATE_FILE", "cache/pipeline_state.json")
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+
+
+def file_fingerprint(paths):
+    """Hash the (path, size, mtime) of every existing file in paths."""
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def peak_rss_mb():
+    """Process-wide peak resident memory in MB (ru_maxrss is KB on Linux)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class Stage:
+    """One pipeline step.
+
+    func(results) receives the results of finished stages by name and returns
+    this stage's result. fingerprint(results), when given, returns a string
+    describing the stage's inputs; the stage is skipped when it matches the
+    last successful run and every path from outputs(results) exists.
+    """
+
+    def __init__(self, name, func, deps=(), fingerprint=None, outputs=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.fingerprint = fingerprint
+        self.outputs = outputs
+
+
+class Pipeline:
+    """Runs stages as a DAG: independent stages run in parallel, dependents wait.
+
+    log(message, **fields) defaults to the "pipeline" job logger; while a
+    stage runs, job loggers tag their records with its name.
+    """
+
+    def __init__(self, stages, state_file=STATE_FILE, max_workers=PIPELINE_WORKERS, log=None):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage(s): {', '.join(missing)}")
+        self.state_file = state_file
+        self.max_workers = max(1, max_workers)
+        self.log = log or get_logger("pipeline")
+        self._state_lock = threading.Lock()
+
+    def run(self, force=False):
+        """Run every stage; returns {name: {"status", "seconds", "peak_rss_mb", ...}}."""
+        state = self._load_state()
+        results, report = {}, {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    dep_status = [report.get(d, {}).get("status") for d in stage.deps]
+                    if any(s in ("failed", "blocked") for s in dep_status):
+                        report[name] = {"status": "blocked", "seconds": 0.0}
+                        self.log(f"⏭️ Stage {name} blocked by a failed dependency")
+                        del pending[name]
+                    elif all(s in ("ok", "skipped") for s in dep_status):
+                        running[pool.submit(self._run_stage, stage, results, state, force)] = name
+                        del pending[name]
+
+                if not running:
+                    # Only reachable with a dependency cycle
+                    for name in pending:
+                        report[name] = {"status": "blocked", "seconds": 0.0}
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    report[name], results[name] = future.result()
+
+        self._save_state(state)
+        return report
+
+    def _run_stage(self, stage, results, state, force):
+        token = current_stage.set(stage.name)
+        try:
+            return self._execute(stage, results, state, force)
+        finally:
+            current_stage.reset(token)
+
+    def _execute(self, stage, results, state, force):
+        fingerprint = stage.fingerprint(results) if stage.fingerprint else None
+        previous = state.get(stage.name, {})
+        outputs_exist = all(os.path.exists(p) for p in (stage.outputs(results) if stage.outputs else []))
+
+        if not force and fingerprint and previous.get("fingerprint") == fingerprint and outputs_exist:
+            self.log(f"⏭️ Stage {stage.name} skipped (inputs unchanged)")
+            return {"status": "skipped", "seconds": 0.0}, None
+
+        self.log(f"▶️ Stage {stage.name} started")
+        start = time.perf_counter()
+        try:
+            result = stage.func(results)
+        except Exception as e:
+            elapsed = round(time.perf_counter() - start, 3)
+            self.log(f"❌ Stage {stage.name} failed after {elapsed}s: {e}", duration=elapsed)
+            return {"status": "failed", "seconds": elapsed, "error": str(e), "peak_rss_mb": peak_rss_mb()}, None
+
+        elapsed = round(time.perf_counter() - start, 3)
+        entry = {"status": "ok", "seconds": elapsed, "peak_rss_mb": peak_rss_mb()}
+        self.log(f"✅ Stage {stage.name} completed in {elapsed}s (peak RSS {entry['peak_rss_mb']} MB)",
+                 duration=elapsed, peak_rss_mb=entry["peak_rss_mb"])
+
+        with self._state_lock:
+            state[stage.name] = {
+                **entry,
+                "fingerprint": fingerprint,
+                "last_success": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        return entry, result
+
+    def _load_state(self):
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+
+# === Daily Pipeline ===
+def build_daily_pipeline(date_str=None, log=None):
+    """Wire the daily download -> sentiment -> predictions (and accuracy) stages for a date."""
+    from app import download_datasets, generate_sentiment, save_predictions, accuracy
+    from app.shards import map_shards, merge_shards
+    from app.sentiment_charts import render_charts, SENTIMENT_CHARTS
+    from app.symbols import symbol_registry
+
+    date_str = date_str or datetime.today().strftime("%Y-%m-%d")
+
+    def articles_fingerprint(results):
+        payload = json.dumps(results.get("fetch_news"), sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def prediction_inputs(results):
+        # The sentiment predictor reads the latest day's file (or the one before, pre-02:45 UTC)
+        sentiment_days = sorted(glob.glob("sentiments/sentiment/*"))[-2:]
+        return file_fingerprint(
+            glob.glob("datasets/*_daily_data.csv")
+            + glob.glob("models/lstm/*.h5")
+            + glob.glob("models/lstm_senti/*.h5")
+            + [p for d in sentiment_days for p in glob.glob(os.path.join(d, "*_sentiment.csv"))]
+            + [symbol_registry.path]
+        )
+
+    def summary_fingerprint(results):
+        return file_fingerprint(glob.glob(f"sentiments/summary/{date_str}/*_summary.csv"))
+
+    def download(results):
+        symbols = symbol_registry.symbols()
+        summary = merge_shards(map_shards(download_datasets.download_all, symbols))
+        return {symbol: summary[symbol] for symbol in symbols}
+
+    stages = [
+        Stage("download_datasets", download),
+        Stage("fetch_news", lambda r: generate_sentiment.fetch_news(date_str)),
+        Stage(
+            "analyze_sentiment",
+            lambda r: generate_sentiment.analyze_sentiment(r["fetch_news"], date_str),
+            deps=["fetch_news"],
+            fingerprint=articles_fingerprint,
+            outputs=lambda r: [f"sentiments/summary/{date_str}/all_symbols_summary.csv"],
+        ),
+        Stage(
+            "score_accuracy",
+            lambda r: accuracy.update_accuracy(date_str, log=get_logger("accuracy")),
+            deps=["download_datasets"],
+        ),
+        Stage(
+            "save_predictions",
+            lambda r: save_predictions.save_predictions(date_str),
+            deps=["download_datasets", "analyze_sentiment"],
+            fingerprint=prediction_inputs,
+            outputs=lambda r: [f"results/{date_str}/lstm.csv", f"results/{date_str}/lstm_senti.csv"],
+        ),
+    ]
+    if SENTIMENT_CHARTS == "eager":
+        # Nothing depends on the charts, so they render alongside the predictions
+        stages.append(Stage(
+            "render_charts",
+            lambda r: render_charts(date_str, log=get_logger("sentiment_charts")),
+            deps=["analyze_sentiment"],
+            fingerprint=summary_fingerprint,
+            outputs=lambda r: [f"sentiments/charts/{date_str}/{s}_chart.png" for s in symbol_registry.symbols()],
+        ))
+    return Pipeline(stages, log=log)
+
+
+def run_daily_pipeline(force=False, log=None):
+    """Build and run today's pipeline; returns the per-stage report."""
+    try:
+        return build_daily_pipeline(log=log).run(force=force)
+    finally:
+        # The pipeline may run in a short-lived worker process
+        flush_logs()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the daily data pipeline in-process.")
+    parser.add_argument("--force", action="store_true", help="run every stage even if its inputs are unchanged")
+    args = parser.parse_args()
+    print(json.dumps(run_daily_pipeline(force=args.force), indent=2))
@@ -1,32 +1,31 @@
-def predict_lstm_price(symbol, time_steps):
-    import numpy as np
-    import pandas as pd
-    from sklearn.preprocessing import MinMaxScaler
-    from tensorflow.keras.models import load_model
-    from datetime import datetime
-    import os
-
-    model_path = f"models/lstm/{symbol}_best_model.h5"
-    data_path = f"datasets/{symbol}_daily_data.csv"
+def build_lstm_input(symbol, time_steps):
+    """Return (model, input window, price series) for an LSTM prediction.
 
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model file not found: {model_path}")
-    if not os.path.exists(data_path):
-        raise FileNotFoundError(f"Stock data file not found: {data_path}")
+    The model is a Keras model or its TFLite export, depending on LSTM_BACKEND.
+    """
+    from app.lstm_runtime import load_lstm
+    from app.price_store import price_store
+    from app.symbols import symbol_registry
 
-    model = load_model(model_path)
+    model_path = symbol_registry.model_path("lstm", symbol)
 
-    df = pd.read_csv(data_path)
-    df = df[['Close']].dropna()
+    model = load_lstm(model_path, time_steps=time_steps)
+    series = price_store.get(symbol)
 
-    if len(df) < time_steps:
+    if len(series) < time_steps:
         raise ValueError("Not enough data")
 
-    scaler = MinMaxScaler()
-    scaled = scaler.fit_transform(df.values)
-    last_sequence = scaled[-time_steps:]
-    last_sequence = np.expand_dims(last_sequence, axis=0)
+    # Scaling bounds are precomputed over the full history, so only the tail is touched
+    last_sequence = series.scaled_tail(time_steps).reshape(1, time_steps, 1)
+    return model, last_sequence, series
+
+
+def predict_lstm_price(symbol, time_steps):
+    model, last_sequence, series = build_lstm_input(symbol, time_steps)
+
+    from app.metrics import model_predict_seconds
 
-    scaled_pred = model.predict(last_sequence)
-    predicted_price = scaler.inverse_transform(scaled_pred)[0][0]
+    with model_predict_seconds.time(family="lstm"):
+        scaled_pred = model.predict(last_sequence)
+    predicted_price = series.inverse(scaled_pred)[0][0]
     return predicted_price
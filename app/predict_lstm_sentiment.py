@@ -1,10 +1,17 @@
-def predict_lstm_sentiment_price(symbol, time_steps):
-    import numpy as np
-    import pandas as pd
-    from sklearn.preprocessing import MinMaxScaler
-    from tensorflow.keras.models import load_model
+import os
+
+import numpy as np
+
+
+def build_lstm_sentiment_input(symbol, time_steps):
+    """Return (model, input window, feature series) for an LSTM+Sentiment prediction.
+
+    The model is a Keras model or its TFLite export, depending on LSTM_BACKEND.
+    """
+    from app.lstm_runtime import load_lstm
+    from app.price_store import price_store
+    from app.symbols import symbol_registry
     from datetime import datetime, timedelta, time
-    import os
 
     # Determine the correct date (yesterday if before 02:45 UTC)
     now_utc = datetime.utcnow()
@@ -13,44 +20,31 @@ def predict_lstm_sentiment_price(symbol, time_steps):
     else:
         effective_date = now_utc.strftime('%Y-%m-%d')
 
-    model_path = f"models/lstm_senti/{symbol}_best_model.h5"
+    model_path = symbol_registry.model_path("lstm_sentiment", symbol)
     sentiment_path = f"sentiments/sentiment/{effective_date}/{symbol}_sentiment.csv"
-    stock_path = f"datasets/{symbol}_daily_data.csv"
 
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model file not found: {model_path}")
     if not os.path.exists(sentiment_path):
         raise FileNotFoundError(f"Sentiment file not found: {sentiment_path}")
-    if not os.path.exists(stock_path):
-        raise FileNotFoundError(f"Stock data file not found: {stock_path}")
 
-    model = load_model(model_path)
-    stock_df = pd.read_csv(stock_path)
-    stock_df['Date'] = pd.to_datetime(stock_df['Date'])
+    model = load_lstm(model_path, time_steps=time_steps)
+    # Persisted (Date, Close, Sentiment) table with precomputed scaling bounds; only the tail is read
+    series = price_store.features(symbol, effective_date)
 
-    sentiment_df = pd.read_csv(sentiment_path)
-    sentiment_df['date'] = pd.to_datetime(sentiment_df['date'])
-    sentiment_df['sentiment_score'] = sentiment_df['sentiment'].map({
-        'POSITIVE': 1,
-        'NEGATIVE': -1,
-        'NEUTRAL': 0
-    })
+    if len(series) < time_steps:
+        raise ValueError("Not enough data for time steps")
 
-    daily_sentiment = sentiment_df.groupby('date')['sentiment_score'].mean().reset_index()
-    daily_sentiment.columns = ['Date', 'Sentiment']
+    last_sequence = np.expand_dims(series.scaled_tail(time_steps), axis=0)
+    return model, last_sequence, series
 
-    merged_df = pd.merge(stock_df[['Date', 'Close']], daily_sentiment, on='Date', how='left')
-    merged_df['Sentiment'].fillna(0, inplace=True)
 
-    if len(merged_df) < time_steps:
-        raise ValueError("Not enough data for time steps")
+def predict_lstm_sentiment_price(symbol, time_steps):
+    model, last_sequence, series = build_lstm_sentiment_input(symbol, time_steps)
 
-    scaler = MinMaxScaler()
-    scaled = scaler.fit_transform(merged_df[['Close', 'Sentiment']])
-    last_sequence = scaled[-time_steps:]
-    last_sequence = np.expand_dims(last_sequence, axis=0)
+    from app.metrics import model_predict_seconds
 
-    scaled_prediction = model.predict(last_sequence)
-    combined = np.concatenate([scaled_prediction, np.zeros_like(scaled_prediction)], axis=1)
-    predicted_price = scaler.inverse_transform(combined)[0][0]
+    with model_predict_seconds.time(family="lstm_sentiment"):
+        scaled_prediction = model.predict(last_sequence)
+    predicted_price = series.inverse(scaled_prediction)[0][0]
     return predicted_price
@@ -0,0 +1,142 @@
+import os
+import threading
+
+import numpy as np
+
+DATASET_DIR = "datasets"
+SENTIMENT_DIR = "sentiments/sentiment"
+
+
+class PriceSeries:
+    """Daily close prices of one symbol with precomputed MinMax scaling bounds."""
+
+    __slots__ = ("symbol", "dates", "close", "min", "max", "mtime")
+
+    def __init__(self, symbol: str, dates: np.ndarray, close: np.ndarray, mtime: float):
+        self.symbol = symbol
+        self.dates = dates
+        self.close = close
+        self.min = float(close.min()) if len(close) else 0.0
+        self.max = float(close.max()) if len(close) else 0.0
+        self.mtime = mtime
+
+    def __len__(self):
+        return len(self.close)
+
+    @property
+    def scale(self) -> float:
+        # Same zero-range handling as sklearn's MinMaxScaler
+        return (self.max - self.min) or 1.0
+
+    def scaled_tail(self, n: int) -> np.ndarray:
+        """Return the last n closes scaled to [0, 1] over the full history."""
+        return (self.close[-n:] - self.min) / self.scale
+
+    def inverse(self, scaled):
+        """Map scaled model output back to a price."""
+        return np.asarray(scaled, dtype=np.float64) * self.scale + self.min
+
+
+class FeatureSeries:
+    """(Date, Close, Sentiment) rows of one symbol with the stored scaling bounds of both features."""
+
+    __slots__ = ("symbol", "dates", "close", "sentiment", "min", "max", "sentiment_min", "sentiment_max", "key")
+
+    def __init__(self, symbol: str, columns: dict, bounds: dict, key):
+        self.symbol = symbol
+        self.dates = columns["date"]
+        self.close = columns["close"]
+        self.sentiment = columns["sentiment"]
+        self.min, self.max = bounds["close"]
+        self.sentiment_min, self.sentiment_max = bounds["sentiment"]
+        self.key = key
+
+    def __len__(self):
+        return len(self.close)
+
+    def scaled_tail(self, n: int) -> np.ndarray:
+        """Return the last n (close, sentiment) rows, each scaled to [0, 1] over the full history."""
+        return np.stack([
+            (self.close[-n:] - self.min) / ((self.max - self.min) or 1.0),
+            (self.sentiment[-n:] - self.sentiment_min) / ((self.sentiment_max - self.sentiment_min) or 1.0),
+        ], axis=1)
+
+    def inverse(self, scaled):
+        """Map scaled model output back to a price."""
+        return np.asarray(scaled, dtype=np.float64) * ((self.max - self.min) or 1.0) + self.min
+
+
+class PriceStore:
+    """Keeps each symbol's price history in memory, reloading when its CSV is rewritten."""
+
+    def __init__(self, data_dir: str = DATASET_DIR):
+        self.data_dir = data_dir
+        self._series = {}
+        self._features = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> PriceSeries:
+        """Return the price series for a symbol, loading it on first use or file change."""
+        path = os.path.join(self.data_dir, f"{symbol}_daily_data.csv")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Stock data file not found: {path}")
+        mtime = os.path.getmtime(path)
+
+        series = self._series.get(symbol)
+        if series is not None and series.mtime == mtime:
+            return series
+
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is None or series.mtime != mtime:
+                series = self._load(symbol, path, mtime)
+                self._series[symbol] = series
+        return series
+
+    def features(self, symbol: str, day: str) -> FeatureSeries:
+        """Return a symbol's (Date, Close, Sentiment) series including day's sentiment CSV.
+
+        Reloaded whenever the price CSV or that sentiment CSV changes. Reads
+        the feature table, or computes the series in memory while the jobs
+        have not caught up; requests never write to the store.
+        """
+        price_path = os.path.join(self.data_dir, f"{symbol}_daily_data.csv")
+        sentiment_path = os.path.join(SENTIMENT_DIR, day, f"{symbol}_sentiment.csv")
+        if not os.path.exists(price_path):
+            raise FileNotFoundError(f"Stock data file not found: {price_path}")
+        key = (day, os.path.getmtime(price_path), os.path.getmtime(sentiment_path))
+
+        series = self._features.get(symbol)
+        if series is not None and series.key == key:
+            return series
+
+        from app.columnar_store import columnar_store
+
+        with self._lock:
+            series = self._features.get(symbol)
+            if series is None or series.key != key:
+                columns, bounds = columnar_store.features(symbol, day)
+                series = FeatureSeries(symbol, columns, bounds, key)
+                self._features[symbol] = series
+        return series
+
+    def invalidate(self, symbol: str = None):
+        """Forget one symbol (or all) so the next read reloads from disk."""
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+                self._features.clear()
+            else:
+                self._series.pop(symbol, None)
+                self._features.pop(symbol, None)
+
+    @staticmethod
+    def _load(symbol: str, path: str, mtime: float) -> PriceSeries:
+        from app.columnar_store import columnar_store
+
+        # Memory-mapped columns; parsed from the CSV instead when the store is behind it
+        columns = columnar_store.read_prices(symbol, path)
+        return PriceSeries(symbol, columns["date"], columns["close"], mtime)
+
+
+price_store = PriceStore()
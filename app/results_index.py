@@ -0,0 +1,142 @@
+import os
+import csv
+import bisect
+import threading
+
+RESULTS_DIR = "results"
+# API model name -> daily file written by save_predictions.py
+RESULT_FILES = {
+    "lstm": "lstm.csv",
+    "lstm_sentiment": "lstm_senti.csv",
+}
+# Window length save_predictions.py uses for the precomputed results
+PRECOMPUTED_TIME_STEPS = 60
+
+
+class ResultsIndex:
+    """In-memory index of the daily prediction CSVs under results/.
+
+    The directory listing is only re-read when results/ itself changes (a new
+    date was added), and a day's files are only re-parsed when their mtime changes.
+    Days already in the columnar store are loaded from it instead of their CSVs.
+    """
+
+    def __init__(self, results_dir: str = RESULTS_DIR):
+        self.results_dir = results_dir
+        self._dir_mtime = None
+        self._dates = []        # sorted date directories seen so far
+        self._file_mtimes = {}  # file path -> [mtime_ns, size] when indexed
+        self._series = {}       # (model, symbol) -> (sorted dates, prices)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Index new date directories and any changed files of the latest day."""
+        try:
+            dir_mtime = os.path.getmtime(self.results_dir)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._dir_mtime is None:
+                self._preload()
+            if dir_mtime != self._dir_mtime:
+                known = set(self._dates)
+                for date in sorted(os.listdir(self.results_dir)):
+                    if date not in known and os.path.isdir(os.path.join(self.results_dir, date)):
+                        bisect.insort(self._dates, date)
+                        self._index_day(date)
+                self._dir_mtime = dir_mtime
+            elif self._dates:
+                # Files of the newest day may still be rewritten in place
+                self._index_day(self._dates[-1])
+
+    def lookup(self, model: str, symbol: str, date: str):
+        """Return the precomputed price for (model, symbol, date), or None."""
+        self.refresh()
+        with self._lock:
+            dates, prices = self._series.get((model, symbol), ([], []))
+            i = bisect.bisect_left(dates, date)
+            if i < len(dates) and dates[i] == date:
+                return prices[i]
+        return None
+
+    def history(self, symbol: str, model: str = None, start: str = None, end: str = None):
+        """Return precomputed predictions for a symbol between two dates (inclusive)."""
+        self.refresh()
+        records = []
+        with self._lock:
+            for name in ([model] if model else RESULT_FILES):
+                dates, prices = self._series.get((name, symbol), ([], []))
+                lo = bisect.bisect_left(dates, start) if start else 0
+                hi = bisect.bisect_right(dates, end) if end else len(dates)
+                records.extend(
+                    {"date": dates[i], "model": name, "predicted_price": prices[i]}
+                    for i in range(lo, hi)
+                )
+        records.sort(key=lambda r: (r["date"], r["model"]))
+        return records
+
+    def _preload(self):
+        """Seed the index from the columnar store so unchanged days are never re-parsed."""
+        from app.columnar_store import ColumnTable, columnar_store
+
+        for model in RESULT_FILES:
+            model_dir = os.path.join(columnar_store.root, "predictions", model)
+            if not os.path.isdir(model_dir):
+                continue
+            for symbol in os.listdir(model_dir):
+                table = ColumnTable(os.path.join(model_dir, symbol))
+                meta = table.meta()
+                columns = table.read(["date", "price"]) if meta else None
+                if columns is None:
+                    continue
+                for date, price in zip(columns["date"].astype(str).tolist(), columns["price"].tolist()):
+                    self._insert(model, symbol, date, price)
+                for date, version in meta["sources"].items():
+                    self._file_mtimes[os.path.join(self.results_dir, date, RESULT_FILES[model])] = version
+
+    def _index_day(self, date: str):
+        from app.columnar_store import file_version
+
+        for model, filename in RESULT_FILES.items():
+            path = os.path.join(self.results_dir, date, filename)
+            version = file_version(path)
+            if self._file_mtimes.get(path) == version:
+                continue
+            # A rewritten (or removed) file replaces everything indexed for that day
+            self._remove_day(model, date)
+            if version is None:
+                self._file_mtimes.pop(path, None)
+                continue
+            self._file_mtimes[path] = version
+
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        price = float(row["predicted_price"])
+                    except (KeyError, TypeError, ValueError):
+                        continue  # failed prediction, no price recorded
+                    if price != price:  # NaN
+                        continue
+                    self._insert(model, row["symbol"], date, price)
+
+    def _remove_day(self, model: str, date: str):
+        for (name, _), (dates, prices) in self._series.items():
+            if name != model:
+                continue
+            i = bisect.bisect_left(dates, date)
+            if i < len(dates) and dates[i] == date:
+                del dates[i]
+                del prices[i]
+
+    def _insert(self, model: str, symbol: str, date: str, price: float):
+        dates, prices = self._series.setdefault((model, symbol), ([], []))
+        i = bisect.bisect_left(dates, date)
+        if i < len(dates) and dates[i] == date:
+            prices[i] = price
+        else:
+            dates.insert(i, date)
+            prices.insert(i, price)
+
+
+results_index = ResultsIndex()
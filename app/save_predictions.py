@@ -1,87 +1,107 @@
 import os
+import time
 import pandas as pd
 from datetime import datetime
-from app.predict_lstm import predict_lstm_price
-from app.predict_lstm_sentiment import predict_lstm_sentiment_price
+from app.batch_predict import predict_batch
+from app.columnar_store import columnar_store, PREDICTION_FILES
+from app.job_log import get_logger
+from app.symbols import symbol_registry, MODELS
+from app.shards import map_shards, PIPELINE_SHARDS
 
 # === Setup ===
-symbols = [
-    "AMZN",        # Amazon
-    "AAPL",        # Apple
-    "GOOGL",       # Alphabet (Class A)
-    "005930.KS",   # Samsung Electronics
-    "2317.TW",     # Foxconn (Taiwan)
-    "MSFT",        # Microsoft
-    "JD",          # JD.com
-    "BABA",        # Alibaba
-    "T",           # AT&T
-    "META"         # Meta (Facebook)
-]
 time_steps = 60
-today = datetime.today().strftime('%Y-%m-%d')
 
-# Directories
-result_dir = os.path.join("results", today)
-log_dir = "logs"
-log_file = os.path.join(log_dir, f"{today}.log")
-os.makedirs(result_dir, exist_ok=True)
-os.makedirs(log_dir, exist_ok=True)
+def get_today():
+    return datetime.today().strftime('%Y-%m-%d')
 
 # Logging Helper
-def log(message):
-    print(message)
-    with open(log_file, "a") as f:
-        f.write(f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
+log = get_logger("save_predictions")
 
-log(f"🟢 Prediction job started for {today}")
+def predict_symbols(symbols, time_steps=time_steps):
+    """predict_batch for each model over the symbols that have it enabled (one shard of the job)."""
+    results = {symbol: {} for symbol in symbols}
+    errors = {}
+    for model in MODELS:
+        enabled = [s for s in symbols if model in symbol_registry.get(s).models]
+        if not enabled:
+            continue
+        batch = predict_batch(enabled, [model], time_steps)
+        for symbol, prices in batch["results"].items():
+            results[symbol].update(prices)
+        for symbol, messages in batch["errors"].items():
+            errors.setdefault(symbol, {}).update(messages)
+    return {"results": results, "errors": errors}
 
-# === Store Results in Memory ===
-lstm_predictions = []
-lstm_senti_predictions = []
+def save_predictions(today=None, symbols=None, shards=PIPELINE_SHARDS):
+    """Predict every tracked symbol with its enabled models and write results/{today}/lstm*.csv."""
+    today = today or get_today()
+    symbols = symbols or symbol_registry.symbols()
+    result_dir = os.path.join("results", today)
+    os.makedirs(result_dir, exist_ok=True)
 
-for symbol in symbols:
-    log(f"🔍 Predicting {symbol}...")
+    log(f"🟢 Prediction job started for {today}")
 
-    try:
-        price_lstm = predict_lstm_price(symbol, time_steps)
-        lstm_predictions.append({
-            "symbol": symbol,
-            "predicted_price": round(price_lstm, 2),
-            "date": today
-        })
-        log(f"✅ {symbol} LSTM Prediction: ${price_lstm:.2f}")
-    except Exception as e:
-        lstm_predictions.append({
-            "symbol": symbol,
-            "predicted_price": None,
-            "date": today,
-            "error": str(e)
-        })
-        log(f"❌ {symbol} LSTM Error: {e}")
+    # === Predict All Symbols in One Batch ===
+    log(f"🔍 Predicting {len(symbols)} symbols...")
+    started = time.perf_counter()
+    batch = {"results": {}, "errors": {}}
+    for part, result in map_shards(predict_symbols, symbols, time_steps, shards=shards):
+        if isinstance(result, Exception):
+            log(f"❌ Prediction shard failed for {', '.join(part)}: {result}")
+            result = {"results": {s: {} for s in part},
+                      "errors": {s: {m: str(result) for m in symbol_registry.get(s).models} for s in part}}
+        batch["results"].update(result["results"])
+        batch["errors"].update(result["errors"])
+    elapsed = time.perf_counter() - started
+    log(f"⏱️ Predicted {len(symbols)} symbols in {elapsed:.1f}s", duration=elapsed)
 
-    try:
-        price_lstm_sent = predict_lstm_sentiment_price(symbol, time_steps)
-        lstm_senti_predictions.append({
-            "symbol": symbol,
-            "predicted_price": round(price_lstm_sent, 2),
-            "date": today
-        })
-        log(f"✅ {symbol} LSTM+Sentiment Prediction: ${price_lstm_sent:.2f}")
-    except Exception as e:
-        lstm_senti_predictions.append({
-            "symbol": symbol,
-            "predicted_price": None,
-            "date": today,
-            "error": str(e)
-        })
-        log(f"❌ {symbol} LSTM+Sentiment Error: {e}")
+    # === Store Results in Memory ===
+    lstm_predictions = []
+    lstm_senti_predictions = []
+
+    for symbol in symbols:
+        prices = batch["results"][symbol]
+        errors = batch["errors"].get(symbol, {})
 
-# === Save Combined CSVs ===
-df_lstm = pd.DataFrame(lstm_predictions)
-df_lstm_senti = pd.DataFrame(lstm_senti_predictions)
+        for family, label, predictions in (
+            ("lstm", "LSTM", lstm_predictions),
+            ("lstm_sentiment", "LSTM+Sentiment", lstm_senti_predictions),
+        ):
+            if family not in symbol_registry.get(symbol).models:
+                continue
+            if family in prices:
+                predictions.append({
+                    "symbol": symbol,
+                    "predicted_price": round(prices[family], 2),
+                    "date": today
+                })
+                log(f"✅ {symbol} {label} Prediction: ${prices[family]:.2f}", symbol=symbol, model=family)
+            else:
+                predictions.append({
+                    "symbol": symbol,
+                    "predicted_price": None,
+                    "date": today,
+                    "error": errors[family]
+                })
+                log(f"❌ {symbol} {label} Error: {errors[family]}", symbol=symbol, model=family)
 
-df_lstm.to_csv(os.path.join(result_dir, "lstm.csv"), index=False)
-df_lstm_senti.to_csv(os.path.join(result_dir, "lstm_senti.csv"), index=False)
+    # === Save Combined CSVs ===
+    df_lstm = pd.DataFrame(lstm_predictions)
+    df_lstm_senti = pd.DataFrame(lstm_senti_predictions)
+
+    df_lstm.to_csv(os.path.join(result_dir, "lstm.csv"), index=False)
+    df_lstm_senti.to_csv(os.path.join(result_dir, "lstm_senti.csv"), index=False)
+
+    log(f"✅ Combined results saved to: {result_dir}/lstm.csv and lstm_senti.csv")
+
+    # === Append to the Columnar Store ===
+    try:
+        for model in PREDICTION_FILES:
+            columnar_store.write_predictions_day(today, model)
+    except Exception as e:
+        log(f"⚠️ Columnar store not updated (will rebuild from CSV): {e}")
+    log("🛑 Prediction job completed.\n")
+    return batch
 
-log(f"✅ Combined results saved to: {result_dir}/lstm.csv and lstm_senti.csv")
-log("🛑 Prediction job completed.\n")
+if __name__ == "__main__":
+    save_predictions()
@@ -1,8 +1,13 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
+from app.metrics import record_job_metrics
+from app.job_log import append_csv
+import multiprocessing
 import subprocess
+import threading
+import fcntl
+import time
 from datetime import datetime
-import csv
 import os
 
 # Load environment variables from .env file
@@ -12,39 +17,45 @@ GIT_TOKEN = os.getenv("GIT_TOKEN")
 # Constants
 LOG_FILE = "logs/scheduler_log.csv"
 GIT_REPO = f"https://{GIT_TOKEN}@github.com/Sevinda-Herath/stock-api.git"
+PIPELINE_ISOLATION = os.getenv("PIPELINE_ISOLATION", "process")  # process | inline
 
 def write_log(status: str):
-    """Append a log entry to the CSV log file."""
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    file_exists = os.path.isfile(LOG_FILE)
-
-    with open(LOG_FILE, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(["Timestamp", "Status"])
-        writer.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), status])
-
-def run_command(command: list[str], label: str):
-    """Run a subprocess command and handle errors."""
-    try:
-        subprocess.run(command, check=True)
-        write_log(f"{label} completed")
-    except subprocess.CalledProcessError as e:
-        write_log(f"{label} failed: {e}")
-        raise
+    """Queue a log entry for the CSV log file (written by the background log writer)."""
+    append_csv(LOG_FILE, ["Timestamp", "Status"], [datetime.now().strftime("%Y-%m-%d %H:%M:%S"), status])
 
 def run_daily_scripts():
-    """Run the daily update pipeline."""
+    """Run the daily update pipeline (download, sentiment, predictions) in one worker process."""
+    from app.pipeline import run_daily_pipeline
+
     print(f"[{datetime.now()}] Running daily dataset and sentiment update...")
     write_log("Started daily update")
 
     try:
-        run_command(["python3", "app/download_datasets.py"], "Download datasets")
-        run_command(["python3", "app/generate_sentiment.py"], "Generate sentiment")
-        run_command(["python3", "app/save_predictions.py"], "Save predictions")
-        print(f"[{datetime.now()}] Daily update completed.")
-    except subprocess.CalledProcessError:
+        if PIPELINE_ISOLATION == "process":
+            # A fresh spawned interpreter keeps TensorFlow/torch work off the API process
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                report = pool.submit(run_daily_pipeline).result()
+        else:
+            report = run_daily_pipeline()
+    except Exception as e:
+        write_log(f"Daily update failed: {e}")
+        print(f"[{datetime.now()}] Daily update failed: {e}")
+        record_job_metrics("daily_update", {"last_run_timestamp": time.time(), "failed_stages": -1})
+        return None
+    for stage, outcome in report.items():
+        detail = f" ({outcome['seconds']}s)" if outcome["status"] == "ok" else ""
+        error = f": {outcome['error']}" if outcome.get("error") else ""
+        write_log(f"{stage} {outcome['status']}{detail}{error}")
+
+    failed = sum(outcome["status"] in ("failed", "blocked") for outcome in report.values())
+    metrics = {"last_run_timestamp": time.time(), "failed_stages": failed}
+    if failed:
         print(f"[{datetime.now()}] Daily update failed.")
+    else:
+        print(f"[{datetime.now()}] Daily update completed.")
+        metrics["last_success_timestamp"] = metrics["last_run_timestamp"]
+    record_job_metrics("daily_update", metrics)
+    return report
 
 def run_git_sync():
     """Sync local changes with remote GitHub repo."""
@@ -71,14 +82,87 @@ def run_git_sync():
         else:
             write_log("No changes to commit")
             print(f"[{datetime.now()}] No changes to commit.")
+        record_job_metrics("git_sync", {"last_success_timestamp": time.time()})
     except subprocess.CalledProcessError as e:
         write_log(f"Git sync failed: {e}")
         print(f"[{datetime.now()}] Git sync failed: {e}")
 
-# Schedule the tasks
-scheduler = BackgroundScheduler()
-scheduler.add_job(run_daily_scripts, 'cron', hour=2, minute=30)  # 02:30 UTC SLTC 08:00
-scheduler.add_job(run_git_sync, 'cron', hour=2, minute=45)       # 02:45 UTC SLTC 08:15
-scheduler.start()
+# === Scheduler Startup ===
+# leader: the one process (e.g. uvicorn worker) holding LOCK_FILE runs the jobs
+# off:    the API never schedules; run `python -m app.scheduler` as a dedicated worker
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "leader")
+LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", "cache/scheduler.lock")
+LEADER_RETRY_SECONDS = int(os.getenv("SCHEDULER_LEADER_RETRY_SECONDS", "60"))
+
+scheduler = None
+_lock_handle = None
+_retry_timer = None  # pending leadership retry, cancelled by stop_scheduler
+
+def acquire_leadership() -> bool:
+    """Take the scheduler file lock without blocking; held until the process exits."""
+    global _lock_handle
+    if _lock_handle is not None:
+        return True
+    os.makedirs(os.path.dirname(LOCK_FILE), exist_ok=True)
+    handle = open(LOCK_FILE, "a+")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    handle.seek(0)
+    handle.truncate()
+    handle.write(f"{os.getpid()}\n")
+    handle.flush()
+    _lock_handle = handle
+    return True
+
+def pid_of_leader():
+    try:
+        with open(LOCK_FILE) as f:
+            return f.read().strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+def retry_leadership():
+    # A timer cancelled (or replaced) by stop_scheduler after it already fired must not start anything
+    if _retry_timer is threading.current_thread():
+        start_scheduler()
+
+def start_scheduler(blocking: bool = False):
+    """Start the daily jobs if this process wins the scheduler lock."""
+    global scheduler, _retry_timer
+    if scheduler is not None:
+        return scheduler
+    if not acquire_leadership():
+        print(f"[{datetime.now()}] Scheduler lock held by another process (pid {pid_of_leader()}); not scheduling here.")
+        if not blocking and LEADER_RETRY_SECONDS > 0:
+            # Take over if the current leader exits
+            _retry_timer = threading.Timer(LEADER_RETRY_SECONDS, retry_leadership)
+            _retry_timer.daemon = True
+            _retry_timer.start()
+        return None
+
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    scheduler = BlockingScheduler() if blocking else BackgroundScheduler()
+    scheduler.add_job(run_daily_scripts, 'cron', hour=2, minute=30)  # 02:30 UTC SLTC 08:00
+    scheduler.add_job(run_git_sync, 'cron', hour=2, minute=45)       # 02:45 UTC SLTC 08:15
+    print(f"[{datetime.now()}] Scheduler started (pid {os.getpid()}).")
+    scheduler.start()
+    return scheduler
+
+def stop_scheduler():
+    """Shut the background scheduler down (on API shutdown); running jobs are not waited for."""
+    global scheduler, _retry_timer
+    if _retry_timer is not None:
+        _retry_timer.cancel()
+        _retry_timer = None
+    if scheduler is not None:
+        scheduler.shutdown(wait=False)
+        scheduler = None
 
-print(f"[{datetime.now()}] Scheduler started and running in background.")
+if __name__ == "__main__":
+    # Dedicated scheduler worker: run alongside the API with SCHEDULER_MODE=off
+    start_scheduler(blocking=True)
@@ -0,0 +1,158 @@
+import os
+import csv
+import time
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# === Configuration ===
+# eager: the daily pipeline renders every chart in its own stage after the summaries
+# lazy:  no chart stage; /sentiment_chart/{symbol} renders a missing chart on first request
+SENTIMENT_CHARTS = os.getenv("SENTIMENT_CHARTS", "eager")
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", str(min(4, os.cpu_count() or 1))))
+CHART_DIR = "sentiments/charts"
+SUMMARY_DIR = "sentiments/summary"
+LABEL_COLORS = {"positive": "green", "negative": "red", "neutral": "gray"}
+
+# Striped: a fixed number of locks, one per hash bucket of chart paths
+_render_locks = [threading.Lock() for _ in range(32)]
+
+
+def chart_path(symbol, date_str):
+    return os.path.join(CHART_DIR, date_str, f"{symbol}_chart.png")
+
+
+def summary_paths(symbol, date_str):
+    summary_dir = os.path.join(SUMMARY_DIR, date_str)
+    return (os.path.join(summary_dir, f"{symbol}_summary.csv"),
+            os.path.join(summary_dir, "all_symbols_summary.csv"))
+
+
+def read_counts(symbol, date_str):
+    """{label: article count} from the day's sentiment summary of symbol, or None without a summary."""
+    for path in summary_paths(symbol, date_str):
+        try:
+            with open(path, newline="") as f:
+                row = next((r for r in csv.DictReader(f) if r["symbol"] == symbol), None)
+        except OSError:
+            continue
+        if row is not None:
+            return {label: int(float(row[f"{label}_count"] or 0)) for label in LABEL_COLORS}
+    return None
+
+
+def render_chart(symbol, date_str, counts):
+    """PNG bytes of the article count per sentiment label (largest first), drawn on a private Agg canvas."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from io import BytesIO
+
+    bars = sorted(((label, n) for label, n in counts.items() if n), key=lambda item: -item[1])
+    fig = Figure(figsize=(6, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar([label for label, _ in bars], [n for _, n in bars], width=0.5,
+           color=[LABEL_COLORS[label] for label, _ in bars])
+    ax.set_title(f"Sentiment for {symbol} News (Last 7 Days, 14/Day) - {date_str}")
+    ax.set_xlabel("Sentiment")
+    ax.set_ylabel("Number of Articles")
+    ax.tick_params(axis="x", labelrotation=0)
+    fig.tight_layout()
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def write_chart(symbol, date_str):
+    """Render symbol's chart for date_str from its summary; returns the PNG path, or None without a summary."""
+    counts = read_counts(symbol, date_str)
+    if counts is None:
+        return None
+    path = chart_path(symbol, date_str)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique temp name: the API and the pipeline may render the same chart at once
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(render_chart(symbol, date_str, counts))
+    os.replace(tmp_path, path)
+    return path
+
+
+def chart_is_current(symbol, date_str):
+    """True when the chart exists and is not older than any summary it could have been drawn from."""
+    try:
+        chart_mtime = os.stat(chart_path(symbol, date_str)).st_mtime_ns
+    except OSError:
+        return False
+    for path in summary_paths(symbol, date_str):
+        try:
+            if os.stat(path).st_mtime_ns > chart_mtime:
+                return False
+        except OSError:
+            continue
+    return True
+
+
+def ensure_chart(symbol, date_str):
+    """Path of symbol's chart for date_str, rendering it when missing or older than the summary; None without a summary.
+
+    Concurrent requests for the same chart render it once.
+    """
+    path = chart_path(symbol, date_str)
+    if chart_is_current(symbol, date_str):
+        return path
+    with _render_locks[hash(path) % len(_render_locks)]:
+        if chart_is_current(symbol, date_str):
+            return path
+        return write_chart(symbol, date_str)
+
+
+def _render_one(symbol, date_str):
+    try:
+        return write_chart(symbol, date_str) or "error: no sentiment summary"
+    except Exception as e:
+        return f"error: {e}"
+
+
+def render_charts(date_str, symbols=None, workers=CHART_WORKERS, log=None):
+    """Render every symbol's chart for date_str in a spawned process pool; returns {symbol: path or error}."""
+    from app.symbols import symbol_registry
+    from app.metrics import record_job_metrics
+    from app.job_log import get_logger
+
+    log = log or get_logger("sentiment_charts")
+    symbols = list(symbols or symbol_registry.symbols())
+    started = time.perf_counter()
+    if workers <= 1 or len(symbols) <= 1:
+        results = {symbol: _render_one(symbol, date_str) for symbol in symbols}
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(symbols)), mp_context=context) as pool:
+            results = dict(zip(symbols, pool.map(_render_one, symbols, [date_str] * len(symbols))))
+    elapsed = time.perf_counter() - started
+
+    for symbol, result in results.items():
+        if result.startswith("error: "):
+            log(f"❌ Failed to generate chart for {symbol}: {result[len('error: '):]}", symbol=symbol)
+        else:
+            log(f"📊 Saved chart: {result}", symbol=symbol)
+    rendered = sum(not r.startswith("error: ") for r in results.values())
+    log(f"✅ Rendered {rendered}/{len(symbols)} sentiment charts in {elapsed:.1f}s", duration=elapsed)
+    # Telemetry only: a failed metrics write must not fail the rendered charts
+    try:
+        record_job_metrics("sentiment_charts", {"charts": rendered, "render_seconds": elapsed})
+    except Exception as e:
+        log(f"⚠️ Chart job metrics not recorded: {e}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the sentiment bar charts from a day's summaries.")
+    parser.add_argument("command", choices=["render"], help="render: (re)draw every chart of the day")
+    parser.add_argument("--date", default=datetime.today().strftime("%Y-%m-%d"))
+    parser.add_argument("--symbols", help="comma-separated symbols (default: all)")
+    parser.add_argument("--workers", type=int, default=CHART_WORKERS)
+    args = parser.parse_args()
+    render_charts(args.date, args.symbols.split(",") if args.symbols else None, args.workers)
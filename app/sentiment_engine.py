@@ -0,0 +1,128 @@
+import os
+import threading
+
+import numpy as np
+
+# === Configuration ===
+MODEL_NAME = os.getenv("SENTIMENT_MODEL", "ProsusAI/finbert")
+BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")  # torch | quantized | onnx
+BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", "512"))
+ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH", "cache/finbert/finbert.onnx")
+BACKENDS = ("torch", "quantized", "onnx")
+
+
+class SentimentEngine:
+    """FinBERT scorer with length-sorted dynamic-padding batches and truncation.
+
+    The model is loaded on the first call to score(), so runs without any
+    articles never pay for it. Backends:
+      - torch:     the Hugging Face model under torch.inference_mode
+      - quantized: the same model with int8 dynamic quantization of Linear layers
+      - onnx:      an ONNX export run with onnxruntime (exported once to ONNX_PATH)
+    """
+
+    def __init__(self, backend=BACKEND, batch_size=BATCH_SIZE, max_length=MAX_LENGTH,
+                 model_name=MODEL_NAME, onnx_path=ONNX_PATH):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown sentiment backend: {backend} (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.model_name = model_name
+        self.onnx_path = onnx_path
+        self._tokenizer = None
+        self._model = None
+        self._session = None
+        self._labels = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._tokenizer is not None
+
+    def load(self):
+        """Load the tokenizer and the configured backend (idempotent)."""
+        with self._lock:
+            if self.loaded:
+                return self
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.eval()
+            self._labels = [model.config.id2label[i].lower() for i in range(model.config.num_labels)]
+
+            if self.backend == "quantized":
+                import torch
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            elif self.backend == "onnx":
+                self._session = self._onnx_session(model, tokenizer)
+                model = None
+
+            self._model = model
+            self._tokenizer = tokenizer
+            return self
+
+    def score(self, texts):
+        """Return [{"label", "score"}] for each text, in input order."""
+        if not texts:
+            return []
+        self.load()
+
+        # Sorting by length keeps each batch's padding close to its longest text
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            probs = self._predict([texts[i] for i in batch_idx])
+            for i, row in zip(batch_idx, probs):
+                best = int(row.argmax())
+                results[i] = {"label": self._labels[best], "score": float(row[best])}
+        return results
+
+    def _predict(self, batch):
+        if self.backend == "onnx":
+            enc = self._tokenizer(batch, padding=True, truncation=True,
+                                  max_length=self.max_length, return_tensors="np")
+            feed = {inp.name: enc[inp.name].astype(np.int64) for inp in self._session.get_inputs()}
+            logits = self._session.run(None, feed)[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            exp = np.exp(logits)
+            return exp / exp.sum(axis=1, keepdims=True)
+
+        import torch
+        enc = self._tokenizer(batch, padding=True, truncation=True,
+                              max_length=self.max_length, return_tensors="pt")
+        with torch.inference_mode():
+            logits = self._model(**enc).logits
+        return torch.softmax(logits, dim=-1).numpy()
+
+    def _onnx_session(self, model, tokenizer):
+        import onnxruntime as ort
+
+        if not os.path.exists(self.onnx_path):
+            export_onnx(model, tokenizer, self.onnx_path)
+        return ort.InferenceSession(self.onnx_path, providers=["CPUExecutionProvider"])
+
+
+def export_onnx(model, tokenizer, path):
+    """Export a sequence-classification model to ONNX with dynamic batch/sequence axes."""
+    import torch
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    dummy = tokenizer(["Stock prices rose today."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=18,
+        )
+    return path
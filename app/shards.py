@@ -0,0 +1,73 @@
+import os
+import multiprocessing
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+
+from app.job_log import current_stage, flush as flush_logs
+
+# === Configuration ===
+# Worker processes a sharded pipeline stage splits its symbols across (1 = run in-process)
+PIPELINE_SHARDS = int(os.getenv("PIPELINE_SHARDS", "1"))
+
+
+def shard_symbols(items, shards):
+    """Split a list of symbols (or a {symbol: value} dict) round-robin into at most shards non-empty parts."""
+    keys = list(items)
+    parts = [keys[i::max(1, shards)] for i in range(max(1, shards))]
+    if isinstance(items, dict):
+        return [{key: items[key] for key in part} for part in parts if part]
+    return [part for part in parts if part]
+
+
+def _run_shard(stage, func, part, args):
+    """Runs in a spawned worker: tag log records with the caller's stage and flush them before returning."""
+    current_stage.set(stage)
+    try:
+        return func(part, *args)
+    finally:
+        flush_logs()
+
+
+def map_shards(func, items, *args, shards=PIPELINE_SHARDS):
+    """Run func(part, *args) for every shard of items; returns [(part, result or exception)].
+
+    With one shard func runs in this process. Otherwise every shard gets its
+    own spawned worker process, so an exception or a crashed interpreter
+    (out of memory, segfault in a native library) fails only the symbols of
+    that shard. func must be a module-level function.
+    """
+    parts = shard_symbols(items, shards)
+    if len(parts) <= 1:
+        outcomes = []
+        for part in parts:
+            try:
+                outcomes.append((part, func(part, *args)))
+            except Exception as e:
+                outcomes.append((part, e))
+        return outcomes
+
+    context = multiprocessing.get_context("spawn")
+    stage = current_stage.get()
+    with ExitStack() as stack:
+        futures = []
+        for part in parts:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=1, mp_context=context))
+            futures.append((part, pool.submit(_run_shard, stage, func, part, args)))
+        outcomes = []
+        for part, future in futures:
+            try:
+                outcomes.append((part, future.result()))
+            except Exception as e:
+                outcomes.append((part, e))
+    return outcomes
+
+
+def merge_shards(outcomes):
+    """Combine the {symbol: value} results of map_shards; every symbol of a failed shard maps to "error: ..."."""
+    merged = {}
+    for part, result in outcomes:
+        if isinstance(result, Exception):
+            merged.update({symbol: f"error: {result}" for symbol in part})
+        else:
+            merged.update(result)
+    return merged
@@ -0,0 +1,101 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+# === Configuration ===
+SNAPSHOT_CACHE_MAX_FILES = int(os.getenv("SNAPSHOT_CACHE_MAX_FILES", "256"))
+
+
+def serialize(payload) -> bytes:
+    """Encode like FastAPI's JSONResponse so cached bodies are byte-identical."""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class _Snapshot:
+    __slots__ = ("mtime_ns", "size", "day", "first", "rows")
+
+    def __init__(self, mtime_ns, size, day, first, rows):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.day = day
+        self.first = first
+        self.rows = rows
+
+
+class SnapshotCache:
+    """Small CSV files parsed once and kept as pre-serialized JSON rows.
+
+    A file is re-read only when its mtime or size changes. Snapshots tagged
+    with a day are dropped as soon as a request for a newer day arrives, so
+    yesterday's summaries do not linger after the 02:45 UTC rollover.
+    """
+
+    def __init__(self, max_files=SNAPSHOT_CACHE_MAX_FILES):
+        self.max_files = max(1, max_files)
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+        self._day = None
+        self.hits = 0
+        self.misses = 0
+
+    def row(self, path, key=None, key_column="symbol", day=None):
+        """Return the JSON bytes of the row whose key_column equals key (first row if key is None).
+
+        Returns None when the file does not exist, is empty or has no such row.
+        """
+        if day is not None:
+            self._roll_over(day)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            snapshot = self._snapshots.get(path)
+            if snapshot is not None and (snapshot.mtime_ns, snapshot.size) == (st.st_mtime_ns, st.st_size):
+                self._snapshots.move_to_end(path)
+                self.hits += 1
+                return snapshot.first if key is None else snapshot.rows.get(key)
+
+        snapshot = self._load(path, st, key_column, day)
+        with self._lock:
+            self.misses += 1
+            self._snapshots[path] = snapshot
+            self._snapshots.move_to_end(path)
+            while len(self._snapshots) > self.max_files:
+                self._snapshots.popitem(last=False)
+        return snapshot.first if key is None else snapshot.rows.get(key)
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._snapshots), "day": self._day, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+    def _roll_over(self, day):
+        with self._lock:
+            if day == self._day:
+                return
+            if self._day is None or day > self._day:
+                self._day = day
+                for path in [p for p, s in self._snapshots.items() if s.day is not None and s.day != day]:
+                    del self._snapshots[path]
+
+    @staticmethod
+    def _load(path, st, key_column, day):
+        import pandas as pd
+
+        records = pd.read_csv(path).to_dict(orient="records")
+        first = serialize(records[0]) if records else None
+        rows = {}
+        for record in records:
+            value = record.get(key_column)
+            if value is not None:
+                rows.setdefault(str(value).upper(), serialize(record))
+        return _Snapshot(st.st_mtime_ns, st.st_size, day, first, rows)
+
+
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,98 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# === Configuration ===
+# off:        ready as soon as the app serves; TensorFlow is imported by the first prediction
+# tensorflow: import TensorFlow and run a tiny LSTM once in the background (skipped with LSTM_BACKEND=tflite)
+# models:     additionally load every model and run one prediction through each
+_legacy_warmup = os.getenv("MODEL_WARMUP", "false").lower() in ("1", "true", "yes")
+API_WARMUP = os.getenv("API_WARMUP", "models" if _legacy_warmup else "tensorflow")
+WARMUP_MODES = ("off", "tensorflow", "models")
+WARMUP_TIME_STEPS = 60
+
+
+def warm_tensorflow():
+    """Import TensorFlow and run one prediction so the runtime and Keras predict path are initialised."""
+    import numpy as np
+    from tensorflow import keras
+
+    model = keras.Sequential([keras.Input((WARMUP_TIME_STEPS, 1)), keras.layers.LSTM(4), keras.layers.Dense(1)])
+    model.predict(np.zeros((1, WARMUP_TIME_STEPS, 1)), verbose=0)
+
+
+class Startup:
+    """Startup phase timings and readiness of this API process.
+
+    The process is live as soon as it serves requests; it is ready once the
+    background warm-up (see API_WARMUP) has finished, successfully or not.
+    """
+
+    def __init__(self, mode=API_WARMUP):
+        if mode not in WARMUP_MODES:
+            raise ValueError(f"Unknown API_WARMUP mode: {mode} (expected one of {', '.join(WARMUP_MODES)})")
+        self.mode = mode
+        self.created = time.time()
+        self.phases = {}
+        self.errors = {}
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def record(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = round(seconds, 4)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase; a failure is recorded instead of raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.errors[name] = str(e)
+            print(f"❌ Startup phase {name} failed: {e}")
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def start(self):
+        """Run the warm-up in a background thread (returns immediately)."""
+        if self.mode == "off":
+            self._ready.set()
+            return
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+
+    def _warm_up(self):
+        from app.lstm_runtime import LSTM_BACKEND
+        from app.model_cache import model_cache
+
+        start = time.perf_counter()
+        try:
+            if LSTM_BACKEND == "keras":
+                with self.phase("tensorflow"):
+                    warm_tensorflow()
+            if self.mode == "models":
+                with self.phase("models"):
+                    model_cache.warm_up(trace=True)
+        finally:
+            self.record("warm_up", time.perf_counter() - start)
+            self._ready.set()
+            print(f"✅ Warm-up ({self.mode}) finished in {self.phases['warm_up']}s; ready for traffic")
+
+    def status(self):
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "warmup": self.mode,
+                "uptime_seconds": round(time.time() - self.created, 1),
+                "phases": dict(self.phases),
+                "errors": dict(self.errors),
+            }
+
+
+startup = Startup()
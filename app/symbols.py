@@ -0,0 +1,104 @@
+import os
+import json
+import threading
+
+# === Configuration ===
+SYMBOLS_FILE = os.getenv("SYMBOLS_FILE", "config/symbols.json")
+# Prediction model name -> model_cache family (the directory under models/)
+MODELS = {"lstm": "lstm", "lstm_sentiment": "lstm_senti"}
+
+
+class SymbolInfo:
+    """One tracked ticker: display name, news query, enabled models and their .h5 paths."""
+
+    __slots__ = ("symbol", "name", "query", "models", "model_paths")
+
+    def __init__(self, symbol, name, query, models, model_paths):
+        self.symbol = symbol
+        self.name = name
+        self.query = query
+        self.models = models
+        self.model_paths = model_paths
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SymbolRegistry:
+    """The symbol universe, read once from SYMBOLS_FILE.
+
+    Each entry names a ticker, its news query and the models enabled for it;
+    model paths default to models/{family}/{symbol}_best_model.h5 unless the
+    entry sets model_paths. Entries with "enabled": false are left out. Every
+    lookup is a dict hit, so the API can reject an unknown symbol before it
+    touches the filesystem.
+    """
+
+    def __init__(self, path=SYMBOLS_FILE):
+        self.path = path
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._load()
+        return self._entries
+
+    def __contains__(self, symbol):
+        return symbol in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, symbol):
+        """Return the SymbolInfo of symbol, or None if it is not tracked."""
+        return self.entries.get(symbol)
+
+    def symbols(self, model=None):
+        """Tracked symbols in file order; with model, only those that have it enabled."""
+        return [s for s, info in self.entries.items() if model is None or model in info.models]
+
+    def queries(self):
+        """{symbol: news query} for every tracked symbol."""
+        return {s: info.query for s, info in self.entries.items()}
+
+    def model_path(self, model, symbol):
+        """The .h5 path of a prediction model ("lstm" / "lstm_sentiment") for symbol."""
+        info = self.entries.get(symbol)
+        if info is not None and model in info.model_paths:
+            return info.model_paths[model]
+        return default_model_path(model, symbol)
+
+    def _load(self):
+        with open(self.path) as f:
+            config = json.load(f)
+        defaults = config.get("defaults", {})
+        entries = {}
+        for item in config["symbols"]:
+            symbol = item["symbol"].upper()
+            if not item.get("enabled", defaults.get("enabled", True)):
+                continue
+            if symbol in entries:
+                raise ValueError(f"Duplicate symbol in {self.path}: {symbol}")
+            models = list(item.get("models", defaults.get("models", list(MODELS))))
+            unknown = [m for m in models if m not in MODELS]
+            if unknown:
+                raise ValueError(f"Unknown model(s) for {symbol} in {self.path}: {', '.join(unknown)}")
+            entries[symbol] = SymbolInfo(
+                symbol,
+                item.get("name", symbol),
+                item.get("query", item.get("name", symbol)),
+                models,
+                dict(item.get("model_paths", {})),
+            )
+        return entries
+
+
+def default_model_path(model, symbol):
+    return os.path.join("models", MODELS[model], f"{symbol}_best_model.h5")
+
+
+symbol_registry = SymbolRegistry()
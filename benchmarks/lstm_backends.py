@@ -0,0 +1,128 @@
+"""Single-window LSTM latency, load time and memory per LSTM backend (keras vs tflite), with an output parity check.
+
+Each backend runs in its own spawned process, so peak RSS and whether
+TensorFlow got imported are measured per backend. Every backend predicts
+the same real price windows; the report includes the largest difference
+from the Keras outputs.
+
+Usage:
+    python -m app.lstm_runtime export
+    PYTHONPATH=. python benchmarks/lstm_backends.py --symbols AAPL,MSFT --windows 200
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAMILIES = {"lstm": "models/lstm", "lstm_senti": "models/lstm_senti"}
+
+
+def load_windows(symbols, count, time_steps=60, seed=0):
+    """Sliding windows of scaled closes ending at the most recent days (sentiment column for lstm_senti is random)."""
+    from app.price_store import price_store
+
+    rng = np.random.default_rng(seed)
+    windows = {}
+    for symbol in symbols:
+        series = price_store.get(symbol)
+        scaled = (series.close - series.min) / series.scale
+        starts = range(max(0, len(scaled) - time_steps - count + 1), len(scaled) - time_steps + 1)
+        prices = np.stack([scaled[i:i + time_steps] for i in starts])[:, :, None]
+        windows[("lstm", symbol)] = prices
+        windows[("lstm_senti", symbol)] = np.concatenate([prices, rng.random(prices.shape)], axis=2)
+    return windows
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1e3, 3)
+
+
+def run_backend(backend, windows):
+    """Runs in a fresh spawned process: load every model under backend and predict each window one at a time."""
+    sys.path.insert(0, REPO_ROOT)
+    from app.lstm_runtime import load_lstm, resolve
+
+    served, loads, latencies, outputs = {}, [], [], {}
+    for (family, symbol), batch in windows.items():
+        h5_path = os.path.join(FAMILIES[family], f"{symbol}_best_model.h5")
+        served[f"{family}/{symbol}"] = "tflite" if resolve(h5_path, backend).endswith(".tflite") else "keras"
+
+        start = time.perf_counter()
+        model = load_lstm(h5_path, backend)
+        model(batch[:1], training=False)  # first call builds the Keras graph / allocates tensors
+        loads.append(time.perf_counter() - start)
+
+        values = []
+        for window in batch:
+            start = time.perf_counter()
+            value = np.asarray(model(window[None], training=False)).reshape(-1)[0]
+            latencies.append(time.perf_counter() - start)
+            values.append(float(value))
+        outputs[f"{family}/{symbol}"] = values
+
+    return {
+        "backend": backend,
+        "models": len(windows),
+        "served_by": served,
+        "tensorflow_imported": "tensorflow" in sys.modules,
+        "load_seconds_total": round(sum(loads), 3),
+        "predictions": len(latencies),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "p99_ms": percentile_ms(latencies, 99),
+        "mean_ms": round(float(np.mean(latencies)) * 1e3, 3),
+        "predictions_per_sec": round(len(latencies) / sum(latencies), 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "outputs": outputs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default="keras,tflite")
+    parser.add_argument("--symbols", help="comma-separated symbols (default: every symbol with both models)")
+    parser.add_argument("--windows", type=int, default=100, help="windows predicted per model")
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    symbols = args.symbols.split(",") if args.symbols else sorted(
+        os.path.basename(path)[:-len("_best_model.h5")] for path in glob.glob("models/lstm/*_best_model.h5")
+        if os.path.exists(os.path.join("models/lstm_senti", os.path.basename(path))))
+    windows = load_windows(symbols, args.windows)
+
+    report = []
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends.split(","):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            report.append(pool.submit(run_backend, backend.strip(), windows).result())
+
+    reference = next((r["outputs"] for r in report if r["backend"] == "keras"), None)
+    for result in report:
+        outputs = result.pop("outputs")
+        if reference is not None:
+            result["max_abs_diff_vs_keras"] = max(
+                float(np.max(np.abs(np.subtract(outputs[name], reference[name])))) for name in outputs)
+        served = sum(kind == result["backend"] for kind in result["served_by"].values())
+        print(f"{result['backend']:>8}: p50 {result['p50_ms']:7.3f} ms  p99 {result['p99_ms']:7.3f} ms  "
+              f"load {result['load_seconds_total']}s  peak RSS {result['peak_rss_mb']} MB  "
+              f"({served}/{result['models']} models on {result['backend']}, "
+              f"TensorFlow {'imported' if result['tensorflow_imported'] else 'not imported'})")
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
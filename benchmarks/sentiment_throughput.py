@@ -0,0 +1,82 @@
+"""FinBERT scoring throughput (articles/sec) per sentiment backend on CPU.
+
+Usage:
+    PYTHONPATH=. python benchmarks/sentiment_throughput.py --backends torch,quantized,onnx --articles 500
+
+Peak RSS is process-wide, so run one backend per invocation to compare memory.
+"""
+import os
+import glob
+import json
+import time
+import argparse
+import resource
+
+import pandas as pd
+
+from app.sentiment_engine import SentimentEngine, BACKENDS, MODEL_NAME
+
+
+def load_texts(limit):
+    """Collect real article texts from the saved sentiment CSVs."""
+    texts = []
+    for path in sorted(glob.glob("sentiments/sentiment/*/*_sentiment.csv"), reverse=True):
+        df = pd.read_csv(path).fillna("")
+        texts.extend(f"{t}. {d}" for t, d in zip(df["title"], df["description"]))
+        if len(texts) >= limit:
+            break
+    if not texts:
+        raise SystemExit("No saved articles found under sentiments/sentiment/")
+    while len(texts) < limit:
+        texts.extend(texts[:limit - len(texts)])
+    return texts[:limit]
+
+
+def run_backend(backend, texts, batch_size, max_length, model_name, onnx_path):
+    engine = SentimentEngine(backend, batch_size, max_length, model_name, onnx_path)
+
+    start = time.perf_counter()
+    engine.load()
+    load_seconds = time.perf_counter() - start
+
+    engine.score(texts[:batch_size])  # warm-up
+
+    start = time.perf_counter()
+    results = engine.score(texts)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "articles": len(texts),
+        "batch_size": batch_size,
+        "load_seconds": round(load_seconds, 3),
+        "score_seconds": round(elapsed, 3),
+        "articles_per_sec": round(len(texts) / elapsed, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "labels": {label: sum(r["label"] == label for r in results) for label in {r["label"] for r in results}},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--model", default=MODEL_NAME, help="model name or local directory")
+    parser.add_argument("--onnx-path", default=os.path.join("cache", "bench", "finbert.onnx"))
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.articles)
+    report = []
+    for backend in args.backends.split(","):
+        result = run_backend(backend.strip(), texts, args.batch_size, args.max_length, args.model, args.onnx_path)
+        print(f"{result['backend']:>10}: {result['articles_per_sec']:8.2f} articles/sec "
+              f"(load {result['load_seconds']}s, peak RSS {result['peak_rss_mb']} MB)")
+        report.append(result)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per-request latency (p50/p99) of the summary and metrics lookups.
+
+Compares the old per-request `os.path.exists` + `pd.read_csv` + `to_dict` path
+with the snapshot cache that serves pre-serialized JSON rows.
+
+Usage:
+    PYTHONPATH=. python benchmarks/snapshot_endpoints.py --requests 2000
+"""
+import os
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from app.snapshot_cache import SnapshotCache, serialize
+
+
+def read_csv_row(path):
+    """What the endpoints did before: parse the CSV on every request."""
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path)
+    return serialize(df.to_dict(orient="records")[0])
+
+
+def percentiles(samples):
+    micros = np.array(samples) * 1e6
+    return {
+        "p50_us": round(float(np.percentile(micros, 50)), 1),
+        "p99_us": round(float(np.percentile(micros, 99)), 1),
+        "mean_us": round(float(micros.mean()), 1),
+    }
+
+
+def measure(lookup, targets, requests):
+    samples = []
+    for i in range(requests):
+        args = targets[i % len(targets)]
+        start = time.perf_counter()
+        body = lookup(*args)
+        samples.append(time.perf_counter() - start)
+        if body is None:
+            raise SystemExit(f"Lookup returned nothing for {args}")
+    return percentiles(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--date", help="summary day to read (default: latest under sentiments/summary/)")
+    args = parser.parse_args(argv)
+
+    date = args.date or sorted(os.listdir("sentiments/summary"))[-1]
+    summary_dir = os.path.join("sentiments/summary", date)
+    summary_files = sorted(glob.glob(os.path.join(summary_dir, "*_summary.csv")))
+    summary_files = [p for p in summary_files if not p.endswith("all_symbols_summary.csv")]
+    metrics_files = sorted(glob.glob("model-metrics-charts/*/metrics/*_model_metrics.csv"))
+
+    symbols = [os.path.basename(p)[:-len("_summary.csv")] for p in summary_files]
+    cache = SnapshotCache()
+    combined = os.path.join(summary_dir, "all_symbols_summary.csv")
+
+    report = {
+        "date": date,
+        "requests": args.requests,
+        "sentiment_summary": {
+            "read_csv": measure(read_csv_row, [(p,) for p in summary_files], args.requests),
+            "snapshot": measure(lambda s: cache.row(combined, s, day=date), [(s,) for s in symbols], args.requests),
+        },
+        "metrics": {
+            "read_csv": measure(read_csv_row, [(p,) for p in metrics_files], args.requests),
+            "snapshot": measure(cache.row, [(p,) for p in metrics_files], args.requests),
+        },
+    }
+    for section in ("sentiment_summary", "metrics"):
+        old, new = report[section]["read_csv"], report[section]["snapshot"]
+        report[section]["p50_speedup"] = round(old["p50_us"] / new["p50_us"], 1)
+        report[section]["p99_speedup"] = round(old["p99_us"] / new["p99_us"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,583 @@
+"""Benchmark suite: API load, predictor cold/warm, FinBERT throughput and the daily pipeline.
+
+Runs entirely offline against the bundled models/ and datasets/ and writes
+one JSON report. Pass --baseline to diff it against a stored report; the
+run exits with status 1 when a tracked metric is worse by more than
+--tolerance.
+
+Sections (--only picks a subset):
+  endpoints   per-endpoint latency/throughput under concurrent load (in-process ASGI client)
+  predictors  cold (empty model/price caches) vs warm prediction time
+  finbert     scoring throughput with a local, randomly initialised FinBERT-shaped model
+  pipeline    the full daily pipeline in a scratch copy of the data, with Yahoo Finance
+              and NewsAPI replaced by fakes serving the bundled CSVs
+
+Usage:
+    PYTHONPATH=. python benchmarks/suite.py --output cache/bench/report.json
+    # No baseline is committed (figures depend on the machine): record one first, then compare to it
+    PYTHONPATH=. python benchmarks/suite.py --output benchmarks/baseline.json
+    PYTHONPATH=. python benchmarks/suite.py --baseline benchmarks/baseline.json
+    PYTHONPATH=. python benchmarks/suite.py --only endpoints,predictors --requests 500 --concurrency 16
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import random
+import shutil
+import asyncio
+import contextlib
+import argparse
+import platform
+import resource
+import subprocess
+import multiprocessing
+from datetime import datetime, timedelta, time as dtime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECTIONS = ("endpoints", "predictors", "finbert", "pipeline")
+STUB_SIZES = {
+    # FinBERT is bert-base: same layer shapes, so per-article compute matches
+    "base": {"hidden_size": 768, "num_hidden_layers": 12, "num_attention_heads": 12, "intermediate_size": 3072},
+    "tiny": {"hidden_size": 128, "num_hidden_layers": 2, "num_attention_heads": 2, "intermediate_size": 512},
+}
+FINBERT_LABELS = {0: "positive", 1: "negative", 2: "neutral"}
+
+# (name, path template, share of --requests); {symbol} rotates over the bundled models
+ENDPOINTS = [
+    ("health", "/health", 1.0),
+    ("sentiment_summary", "/sentiment_summary/{symbol}", 1.0),
+    ("sentiment_chart", "/sentiment_chart/{symbol}", 1.0),
+    ("metrics_lstm", "/metrics/lstm/{symbol}", 1.0),
+    ("accuracy", "/accuracy/{symbol}", 1.0),
+    ("prediction_history", "/predictions/history/{symbol}", 1.0),
+    ("predict_lstm", "/predict/lstm?symbol={symbol}", 0.5),
+    ("predict_lstm_sentiment", "/predict/lstm_sentiment?symbol={symbol}", 0.5),
+    ("predict_horizon", "/predict/lstm/horizon?symbol={symbol}&steps=5", 0.25),
+    ("backtest", "/backtest/lstm/{symbol}?from=2024-01-01", 0.25),
+    ("predict_batch", "/predict/batch?symbols={symbol}", 0.1),
+    ("prometheus", "/metrics", 1.0),
+]
+
+# Metric name suffix -> whether a larger value is better
+TRACKED_SUFFIXES = {
+    "_ms": False,
+    "_seconds": False,
+    "_mb": False,
+    "_per_sec": True,
+}
+
+
+# === Helpers ===
+def offline_env():
+    """Settings applied before any app module is imported (explicit env values win)."""
+    os.environ.setdefault("SCHEDULER_MODE", "off")
+    os.environ.setdefault("MODEL_WARMUP", "false")
+    os.environ.setdefault("NEWS_MAX_REQUESTS_PER_SEC", "0")
+    os.environ.setdefault("PIPELINE_ISOLATION", "inline")
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+
+def seed(value):
+    random.seed(value)
+    np.random.seed(value)
+    try:
+        import torch
+        torch.manual_seed(value)
+    except ImportError:
+        pass
+
+
+def summarize(samples):
+    """Latency percentiles in milliseconds."""
+    millis = np.array(samples) * 1e3
+    return {
+        "p50_ms": round(float(np.percentile(millis, 50)), 3),
+        "p95_ms": round(float(np.percentile(millis, 95)), 3),
+        "p99_ms": round(float(np.percentile(millis, 99)), 3),
+        "mean_ms": round(float(millis.mean()), 3),
+    }
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def effective_today():
+    """The day the live predictors read sentiment for (the previous day before 02:45 UTC, as in the API)."""
+    now_utc = datetime.utcnow()
+    if now_utc.time() < dtime(2, 45):
+        now_utc -= timedelta(days=1)
+    return now_utc.strftime("%Y-%m-%d")
+
+
+def link_today(sentiment_dir, day):
+    """Serve `day`'s folder as today's, so date-keyed lookups find files whatever the date."""
+    today = os.path.join(sentiment_dir, effective_today())
+    if not os.path.exists(today):
+        os.symlink(day, today)
+
+
+def bundled_symbols(limit):
+    """Symbols that have both an LSTM and an LSTM+sentiment model and a dataset."""
+    lstm = {os.path.basename(p)[:-len("_best_model.h5")] for p in glob.glob("models/lstm/*_best_model.h5")}
+    senti = {os.path.basename(p)[:-len("_best_model.h5")] for p in glob.glob("models/lstm_senti/*_best_model.h5")}
+    data = {os.path.basename(p)[:-len("_daily_data.csv")] for p in glob.glob("datasets/*_daily_data.csv")}
+    symbols = sorted(lstm & senti & data)
+    if not symbols:
+        raise SystemExit("No bundled models/datasets found (run from the repository root)")
+    return symbols[:limit] if limit else symbols
+
+
+def environment():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": version("numpy"),
+        "tensorflow": version("tensorflow"),
+        "torch": version("torch"),
+        "transformers": version("transformers"),
+    }
+
+
+def prepare_workspace(workspace):
+    """A scratch working directory over the bundled data, so runs neither depend on nor touch the tree's caches."""
+    shutil.rmtree(workspace, ignore_errors=True)
+    os.makedirs(workspace)
+    for name in ("config", "models", "datasets", "results", "accuracy", "model-metrics-charts", "static"):
+        if os.path.exists(os.path.join(REPO_ROOT, name)):
+            os.symlink(os.path.join(REPO_ROOT, name), os.path.join(workspace, name))
+
+    # Daily sentiment folders are linked one by one, plus the latest one again as today's
+    for kind in ("sentiment", "summary", "charts"):
+        source, target = os.path.join(REPO_ROOT, "sentiments", kind), os.path.join(workspace, "sentiments", kind)
+        os.makedirs(target)
+        days = sorted(d for d in os.listdir(source) if re.fullmatch(r"\d{4}-\d{2}-\d{2}", d))
+        for day in days:
+            os.symlink(os.path.join(source, day), os.path.join(target, day))
+        link_today(target, days[-1])
+
+
+# === Endpoints ===
+async def load_endpoint(client, paths, requests, concurrency):
+    """Send `requests` GETs over `concurrency` connections; paths are used round-robin."""
+    latencies, statuses = [], Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "requests_per_sec": round(requests / elapsed, 2),
+        **summarize(latencies),
+        "status": dict(sorted(statuses.items())),
+    }
+
+
+async def run_endpoints(symbols, requests, concurrency, names=None):
+    import httpx
+    from app.api import app
+
+    transport = httpx.ASGITransport(app=app)
+    report = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, template, share in ENDPOINTS:
+            if names and name not in names:
+                continue
+            paths = [template.format(symbol=s) for s in symbols]
+
+            # The first pass over every path fills model/snapshot/result caches
+            start = time.perf_counter()
+            for path in paths:
+                await client.get(path)
+            first_pass = (time.perf_counter() - start) / len(paths)
+
+            n = max(concurrency, int(requests * share))
+            report[name] = {
+                "path": template,
+                "first_request_ms": round(first_pass * 1e3, 3),
+                **await load_endpoint(client, paths, n, concurrency),
+            }
+            print(f"  {name:>24}: {report[name]['requests_per_sec']:9.1f} req/s  "
+                  f"p50 {report[name]['p50_ms']:8.2f} ms  p99 {report[name]['p99_ms']:8.2f} ms  "
+                  f"{report[name]['status']}")
+    return report
+
+
+# === Predictors ===
+def run_predictors(symbols, repeats):
+    from app.model_cache import model_cache
+    from app.price_store import price_store
+    from app.predict_lstm import predict_lstm_price
+    from app.predict_lstm_sentiment import predict_lstm_sentiment_price
+
+    predictors = {"lstm": predict_lstm_price, "lstm_sentiment": predict_lstm_sentiment_price}
+    report = {}
+    for name, predict in predictors.items():
+        cold, warm = [], []
+        for symbol in symbols:
+            model_cache.clear()
+            price_store.invalidate()
+            start = time.perf_counter()
+            predict(symbol, 60)
+            cold.append(time.perf_counter() - start)
+            for _ in range(repeats):
+                start = time.perf_counter()
+                predict(symbol, 60)
+                warm.append(time.perf_counter() - start)
+        cold_stats, warm_stats = summarize(cold), summarize(warm)
+        report[name] = {
+            "symbols": len(symbols),
+            "warm_repeats": repeats,
+            # The very first call also pays for importing TensorFlow and tracing the graph
+            "first_call_ms": round(cold[0] * 1e3, 3),
+            "cold": cold_stats,
+            "warm": warm_stats,
+            "cold_to_warm_ratio": round(cold_stats["p50_ms"] / warm_stats["p50_ms"], 1),
+        }
+        print(f"  {name:>24}: cold p50 {cold_stats['p50_ms']:8.2f} ms  warm p50 {warm_stats['p50_ms']:8.2f} ms")
+    return report
+
+
+# === FinBERT ===
+def make_finbert_stub(texts, size, out_dir):
+    """Save a randomly initialised bert-base-shaped classifier and a word-level vocab built from texts."""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+    import torch
+
+    path = os.path.join(out_dir, f"finbert-stub-{size}")
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+
+    words = sorted({w for text in texts for w in re.findall(r"\w+|[^\w\s]", text.lower())})
+    os.makedirs(path, exist_ok=True)
+    vocab_path = os.path.join(path, "vocab.txt")
+    with open(vocab_path, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words) + "\n")
+    tokenizer = BertTokenizer(vocab_path, do_lower_case=True)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        max_position_embeddings=512,
+        num_labels=len(FINBERT_LABELS),
+        id2label=FINBERT_LABELS,
+        label2id={v: k for k, v in FINBERT_LABELS.items()},
+        **STUB_SIZES[size],
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+
+def run_finbert(backends, texts, batch_size, model_path):
+    from sentiment_throughput import run_backend
+
+    report = {}
+    for backend in backends:
+        onnx_path = os.path.join(os.path.dirname(model_path), f"{os.path.basename(model_path)}.onnx")
+        result = run_backend(backend, texts, batch_size, 512, model_path, onnx_path)
+        report[backend] = {k: v for k, v in result.items() if k not in ("backend", "labels")}
+        print(f"  {backend:>24}: {result['articles_per_sec']:9.1f} articles/sec  (load {result['load_seconds']}s)")
+    return report
+
+
+# === Daily Pipeline ===
+class FakeTicker:
+    """yfinance.Ticker stand-in serving bars from the bundled datasets."""
+
+    latency = 0.0
+    source_dir = os.path.join(REPO_ROOT, "datasets")
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, start=None, end=None, **kwargs):
+        import pandas as pd
+
+        time.sleep(self.latency)
+        df = pd.read_csv(os.path.join(self.source_dir, f"{self.symbol}_daily_data.csv"), float_precision="round_trip")
+        dates = df["Date"].astype(str).str[:10]
+        df = df[(dates >= start) & (dates < end)]
+        return df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop("Date")), name="Date"))
+
+
+def saved_articles():
+    """{(query, day): [NewsAPI-style article]} from every saved sentiment CSV in the repository."""
+    import pandas as pd
+    from app.symbols import symbol_registry
+
+    stock_queries = symbol_registry.queries()
+
+    articles = {}
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, "sentiments/sentiment/*/*_sentiment.csv"))):
+        symbol = os.path.basename(path)[:-len("_sentiment.csv")]
+        if symbol not in stock_queries:
+            continue
+        for row in pd.read_csv(path).fillna("").itertuples():
+            day = str(row.date)[:10]
+            bucket = articles.setdefault((stock_queries[symbol], day), {})
+            bucket.setdefault(row.title, {
+                "title": row.title,
+                "description": row.description,
+                "publishedAt": f"{day}T12:00:00Z",
+            })
+    return {key: list(bucket.values()) for key, bucket in articles.items()}
+
+
+def fake_news_adapter(articles, latency):
+    """HTTPAdapter subclass answering NewsAPI requests from `articles` without touching the network."""
+    from urllib.parse import urlparse, parse_qs
+    from requests import Response
+    from requests.adapters import HTTPAdapter
+
+    class FakeNewsAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            time.sleep(latency)
+            params = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+            page = articles.get((params.get("q"), params.get("from")), [])[:int(params.get("pageSize", 14))]
+            response = Response()
+            response.status_code = 200
+            response.url = request.url
+            response.request = request
+            response.headers["Content-Type"] = "application/json"
+            response._content = json.dumps({"status": "ok", "articles": page}).encode()
+            return response
+
+    return FakeNewsAdapter
+
+
+def prepare_scratch(scratch, drop_days):
+    """Copy the data the pipeline reads into scratch, with the last drop_days rows of each dataset removed."""
+    import pandas as pd
+
+    shutil.rmtree(scratch, ignore_errors=True)
+    os.makedirs(os.path.join(scratch, "datasets"))
+    for path in glob.glob(os.path.join(REPO_ROOT, "datasets", "*_daily_data.csv")):
+        df = pd.read_csv(path, dtype=str)
+        df.iloc[:len(df) - drop_days].to_csv(os.path.join(scratch, "datasets", os.path.basename(path)), index=False)
+    os.symlink(os.path.join(REPO_ROOT, "config"), os.path.join(scratch, "config"))
+    os.symlink(os.path.join(REPO_ROOT, "models"), os.path.join(scratch, "models"))
+    for day in sorted(os.listdir(os.path.join(REPO_ROOT, "sentiments/sentiment")))[-2:]:
+        shutil.copytree(os.path.join(REPO_ROOT, "sentiments/sentiment", day),
+                        os.path.join(scratch, "sentiments/sentiment", day))
+
+
+def pipeline_child(scratch, date_str, model_path, source_latency):
+    """Runs in a fresh spawned process: install the fakes, chdir into scratch and run the pipeline."""
+    sys.path.insert(0, REPO_ROOT)
+    os.environ["SENTIMENT_MODEL"] = model_path
+    # The fakes below only exist in this process, so the stages must not shard into fresh workers
+    os.environ["PIPELINE_SHARDS"] = "1"
+    offline_env()
+    seed(0)
+    os.chdir(scratch)
+
+    import types
+    FakeTicker.latency = source_latency
+    sys.modules["yfinance"] = types.SimpleNamespace(Ticker=FakeTicker)
+
+    from app import news_fetcher
+    news_fetcher.HTTPAdapter = fake_news_adapter(saved_articles(), source_latency)
+
+    from app.pipeline import build_daily_pipeline
+    from app.columnar_store import columnar_store
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # A deployed tree already has its store; only the pipeline's own appends are timed
+        columnar_store.migrate()
+        link_today(os.path.join("sentiments", "sentiment"), date_str)
+        start = time.perf_counter()
+        stages = build_daily_pipeline(date_str).run(force=True)
+        elapsed = time.perf_counter() - start
+
+    with open(os.path.join("cache", "job_metrics.json")) as f:
+        jobs = json.load(f)
+    return {
+        "date": date_str,
+        "total_seconds": round(elapsed, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": dict(sorted(stages.items())),
+        "articles": jobs.get("sentiment", {}).get("articles"),
+        "articles_per_sec": round(jobs.get("sentiment", {}).get("articles_per_second", 0.0), 2),
+        "news_requests": jobs.get("news_fetch", {}).get("requests"),
+    }
+
+
+def run_pipeline(drop_days, model_path, source_latency, scratch):
+    # The date whose news the bundled CSVs cover, so the fake NewsAPI has articles for the whole week
+    date_str = sorted(d for d in os.listdir(os.path.join(REPO_ROOT, "sentiments/sentiment")) if re.fullmatch(r"\d{4}-\d{2}-\d{2}", d))[-1]
+    prepare_scratch(scratch, drop_days)
+    # A fresh process, as the scheduler uses, so nothing is already imported, loaded or cached
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        report = pool.submit(pipeline_child, scratch, date_str, model_path, source_latency).result()
+    for name, entry in report["stages"].items():
+        print(f"  {name:>24}: {entry['status']:>8} {entry['seconds']:9.3f} s")
+    print(f"  {'total':>24}: {report['total_seconds']:18.3f} s")
+    return report
+
+
+# === Baseline Comparison ===
+def flatten(report, prefix=""):
+    flat = {}
+    for key, value in report.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def higher_is_better(name):
+    """True/False for tracked metrics, None for values that are only context (counts, settings)."""
+    leaf = name.rsplit(".", 1)[-1]
+    for suffix, higher in TRACKED_SUFFIXES.items():
+        if leaf.endswith(suffix):
+            return higher
+    return None
+
+
+def compare(report, baseline, tolerance):
+    """Per-metric change against the baseline; a regression is a change beyond tolerance in the wrong direction."""
+    current, previous = flatten(report["results"]), flatten(baseline.get("results", {}))
+    changes, regressions = {}, []
+    for name in sorted(current.keys() & previous.keys()):
+        higher = higher_is_better(name)
+        if higher is None or not previous[name]:
+            continue
+        change = (current[name] - previous[name]) / abs(previous[name])
+        changes[name] = {"baseline": previous[name], "current": current[name], "change": round(change, 4)}
+        if (change < -tolerance) if higher else (change > tolerance):
+            regressions.append(name)
+    return {
+        "baseline_commit": baseline.get("environment", {}).get("commit"),
+        "tolerance": tolerance,
+        "regressions": regressions,
+        "changes": changes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"comma-separated sections ({', '.join(SECTIONS)})")
+    parser.add_argument("--symbols", type=int, default=0, help="limit to the first N bundled symbols (0 = all)")
+    parser.add_argument("--endpoints", help="comma-separated endpoint names (default: all)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint (heavy endpoints send a share)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=20, help="warm predictions per symbol")
+    parser.add_argument("--backends", default="torch", help="FinBERT backends to time")
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--stub-size", choices=sorted(STUB_SIZES), default="base",
+                        help="shape of the local FinBERT stub (base = FinBERT's)")
+    parser.add_argument("--finbert-model", help="use this local model directory instead of the stub")
+    parser.add_argument("--drop-days", type=int, default=5, help="dataset rows the pipeline has to download")
+    parser.add_argument("--source-latency", type=float, default=0.0,
+                        help="seconds each faked Yahoo Finance/NewsAPI call sleeps")
+    parser.add_argument("--scratch-dir", default=os.path.join("cache", "bench"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("cache", "bench", "report.json"))
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    sections = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+
+    offline_env()
+    seed(args.seed)
+    symbols = bundled_symbols(args.symbols)
+    scratch_dir = os.path.abspath(args.scratch_dir)
+    output, baseline = os.path.abspath(args.output), args.baseline and os.path.abspath(args.baseline)
+    texts, model_path = None, None
+    if "finbert" in sections or "pipeline" in sections:
+        from sentiment_throughput import load_texts
+        texts = load_texts(args.articles)
+        model_path = os.path.abspath(args.finbert_model or make_finbert_stub(texts, args.stub_size, scratch_dir))
+
+    results = {}
+    started = time.perf_counter()
+    # The pipeline runs first, in its own process; the other sections share this one
+    if "pipeline" in sections:
+        print("🏭 Daily pipeline")
+        results["pipeline"] = run_pipeline(args.drop_days, model_path, args.source_latency,
+                                           os.path.join(scratch_dir, "pipeline"))
+    if "predictors" in sections or "endpoints" in sections:
+        workspace = os.path.join(scratch_dir, "workspace")
+        prepare_workspace(workspace)
+        os.chdir(workspace)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            from app.columnar_store import columnar_store
+            columnar_store.migrate()
+    if "predictors" in sections:
+        print("🔮 Predictors (cold vs warm)")
+        results["predictors"] = run_predictors(symbols, args.repeats)
+    if "endpoints" in sections:
+        print(f"🌐 Endpoints ({args.concurrency} concurrent)")
+        names = set(args.endpoints.split(",")) if args.endpoints else None
+        results["endpoints"] = asyncio.run(run_endpoints(symbols, args.requests, args.concurrency, names))
+    if "finbert" in sections:
+        print("🧠 FinBERT throughput")
+        results["finbert"] = run_finbert(args.backends.split(","), texts, args.batch_size, model_path)
+
+    report = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "symbols": symbols,
+        "suite_seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+    status = 0
+    if baseline:
+        with open(baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        for name in report["comparison"]["regressions"]:
+            change = report["comparison"]["changes"][name]
+            print(f"❌ {name}: {change['baseline']} -> {change['current']} ({change['change']:+.1%})")
+        status = 1 if report["comparison"]["regressions"] else 0
+        if not status:
+            print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"📄 Report written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())